@@ -1,8 +1,14 @@
 from serial import Serial
+import os
 import time
+import math
+import threading
+from collections import deque
 from Drivers.transmission_packet import TransmissionPacket, FullPacket
 from lib.exceptions import wrap_errors, APRSError, LogicalError
 from Drivers.device import Device
+from lib.metrics import timed_io
+from lib import opcodes
 import copy
 
 
@@ -13,20 +19,37 @@ class APRS(Device):
     DEVICE_PATH = '/sys/devices/platform/soc/20980000.usb/buspower'
     BAUDRATE = 19200
     MAX_DATASIZE = 100
+    POLL_INTERVAL = 0.05  # Time for reader thread to wait when no bytes are available, in seconds
+    MAX_UNPARSED = 1000  # Longest incomplete line kept by the reader thread, in bytes
+    BOOT_TIME = 0  # Readiness is probed in __init__ instead
+    BOOT_TIMEOUT = 5  # Longest time to wait for the USB serial port to appear after power on, in seconds
 
     @wrap_errors(APRSError)
     def __init__(self, state_field_registry):
         super().__init__(state_field_registry)
-        try:
-            self.serial = Serial(port=self.PORT, baudrate=self.BAUDRATE, timeout=1)  # connect serial
-        except:
+        # The port only exists once the radio has enumerated over USB, so it can't be kept open across power cycles
+        # Only clear data lines, which takes 15 seconds, if it doesn't enumerate in time
+        if not self.wait_until(lambda: os.path.exists(self.PORT), self.BOOT_TIMEOUT):
             self.clear_data_lines()
+            self.wait_until(lambda: os.path.exists(self.PORT), self.BOOT_TIMEOUT)
         self.serial = Serial(port=self.PORT, baudrate=self.BAUDRATE, timeout=1)  # connect serial
-        while not self.serial.is_open:
-            time.sleep(0.5)
+        # Reader thread continuously drains the serial port, reassembles lines and parses them into FullPackets
+        # deque append and popleft are atomic, so the main thread can consume packets without locking
+        self.received = deque()
+        self.unparsed = bytearray()  # Bytes after the last complete line
+        self.reader_error = None  # Exception which stopped the reader thread, raised on the main thread
+        # Held by the reader thread while it reads, and by anything else which needs to read serial directly
+        self.reader_lock = threading.Lock()
+        self.reading = threading.Event()
+        self.reading.set()
+        self.reader_thread = threading.Thread(target=self.reader, name="APRS reader", daemon=True)
+        self.reader_thread.start()
 
     @wrap_errors(APRSError)
     def terminate(self):
+        self.reading.clear()
+        self.reader_thread.join()
+        self.next_msg()  # Don't lose packets received before shutdown
         self.serial.close()
 
     @wrap_errors(LogicalError)
@@ -80,8 +103,9 @@ class APRS(Device):
         """
         if self.serial is None:
             self.serial = Serial(port=self.PORT, baudrate=self.BAUDRATE, timeout=1)
-        self.enter_firmware_menu()
-        self.exit_firmware_menu()
+        with self.reader_lock:  # Keep reader thread from consuming firmware menu output
+            self.enter_firmware_menu()
+            self.exit_firmware_menu()
         return True
 
     @wrap_errors(LogicalError)
@@ -118,22 +142,46 @@ class APRS(Device):
 
         result.append(packet)
         lastindex = 0
-        for i in range(len(data)):
+        for i in range(1, len(data) + 1):  # Slices end at i, so go one past the end to include the last element
             pckt = copy.deepcopy(packet)
             if packet.numerical:
                 pckt.return_data = data[lastindex:i]
             else:
                 pckt.return_data = [data[lastindex:i]]
             pckt.index = len(result) - 1
-            if len(str(pckt)) <= APRS.MAX_DATASIZE:
+            if len(str(pckt)) <= APRS.MAX_DATASIZE or i - lastindex == 1:  # Always make progress
                 result[-1] = pckt
-            else:
-                lastindex = i
+            else:  # data[lastindex:i - 1] was the most that fit, start the next packet at element i - 1
+                lastindex = i - 1
                 pckt = copy.deepcopy(packet)
+                if packet.numerical:
+                    pckt.return_data = data[lastindex:i]
+                else:
+                    pckt.return_data = [data[lastindex:i]]
                 pckt.index = len(result)
                 result.append(pckt)
         return result
 
+    @staticmethod
+    @wrap_errors(APRSError)
+    def encoded_size(count: int, numerical: bool) -> int:
+        """
+        Projects total length of a response after split_packet, without building it
+        Upper bound for numerical packets, since every value is assumed to take its longest form
+        :param count: (int) number of values for numerical packets, characters for string packets
+        :param numerical: (bool) whether packet is numerical
+        :return: (int) total characters over all split packets
+        """
+        empty = FullPacket("XXX", [], 0xffff)  # Longest possible descriptor and msn
+        empty.set_time()
+        empty.numerical = numerical
+        if not numerical:
+            empty.return_data = [""]
+        header = len(str(empty))
+        item = len(":" + f"{-1.2345e-10:.5}") if numerical else 1  # Separator and longest formatted value
+        capacity = (APRS.MAX_DATASIZE - header) // item  # Items per split packet
+        return max(1, math.ceil(count / capacity)) * header + count * item
+
     @wrap_errors(APRSError)
     def transmit(self, packet: TransmissionPacket) -> bool:
         """
@@ -148,35 +196,78 @@ class APRS(Device):
             "size": len(str(packet)),
         })
         self.sfr.vars.BATTERY_CAPACITY_INT -= APRS.TRANSMISSION_ENERGY
+        self.sfr.metrics.add_transmission(len(str(packet)), APRS.TRANSMISSION_ENERGY)
         return self.write(str(packet))
 
     @wrap_errors(APRSError)
     def next_msg(self):
         """
-        Reads in any messages, process, and add to queue
-        """
-        msgs = self.read().split("\r\n")
-        print(msgs)
-        for msg in msgs:
-            if msg.find(prefix := self.sfr.command_executor.TJ_PREFIX) != -1:
-                print("TJ message received")
-                processed = msg[msg.find(prefix) + len(prefix):].strip().split(":")[:-1]
-                print(processed)
-                if processed[0] in self.sfr.command_executor.primary_registry.keys():
-                    if len(processed) > 2:
-                        self.sfr.vars.command_buffer.append(FullPacket(processed[0], [float(s) for s in processed[2:]], int(processed[1])))
-                    else:
-                        self.sfr.vars.command_buffer.append(FullPacket(processed[0], [], int(processed[1])))
-            elif msg.find(prefix := self.sfr.command_executor.OUTREACH_PREFIX) != -1:
-                print("Outreach message received")
-                processed = msg[msg.find(prefix) + len(prefix):].strip().split(":")[:-1]
-                if processed[0] in self.sfr.command_executor.secondary_registry.keys():
-                    if len(processed) > 2:
-                        self.sfr.vars.command_buffer.append(FullPacket(processed[0], [float(s) for s in processed[2:]], int(processed[1]), outreach=True))
-                    else:
-                        self.sfr.vars.command_buffer.append(FullPacket(processed[0], [], int(processed[1]), outreach=True))
+        Moves packets parsed by the reader thread into the command buffers without blocking
+        """
+        if self.reader_error is not None:
+            raise APRSError(details="Reader thread stopped: " + repr(self.reader_error))
+        while len(self.received) > 0:
+            packet = self.received.popleft()
+            if packet.outreach:
+                self.sfr.vars.outreach_buffer.append(packet)
+            else:
+                self.sfr.vars.command_buffer.append(packet)
+
+    def reader(self) -> None:
+        """
+        Body of the reader thread, runs until terminate
+        Not wrapped since exceptions can't propagate out of a thread, stores them for next_msg instead
+        """
+        try:
+            while self.reading.is_set():
+                with self.reader_lock:
+                    data = self.serial.read(self.serial.in_waiting) if self.serial.in_waiting > 0 else b""
+                if len(data) == 0:
+                    time.sleep(self.POLL_INTERVAL)
+                    continue
+                self.unparsed += data
+                *lines, rest = self.unparsed.split(b"\r\n")
+                self.unparsed = bytearray(rest[-self.MAX_UNPARSED:])
+                for line in lines:
+                    try:
+                        for packet in self.parse(line.decode("utf-8", errors="ignore")):
+                            self.received.append(packet)
+                    except (ValueError, IndexError) as e:
+                        print("Garbled APRS message received " + repr(e))
+        except Exception as e:
+            self.reader_error = e
+
+    def parse(self, msg: str) -> list:
+        """
+        Parses one line received from APRS
+        A line holds one command, or several separated by "&" to be executed in order:
+        "TJ;DESC:msn:args...:" or "TJ;DESC1:msn1:args...:&DESC2:msn2:args...:"
+        :param msg: (str) line, without line ending
+        :return: (list) of FullPackets, empty if line doesn't hold commands
+        """
+        if msg.find(prefix := self.sfr.command_executor.TJ_PREFIX) != -1:
+            registry, outreach = self.sfr.command_executor.primary_registry, False
+        elif msg.find(prefix := self.sfr.command_executor.OUTREACH_PREFIX) != -1:
+            registry, outreach = self.sfr.command_executor.secondary_registry, True
+        else:
+            return []
+        packets = []
+        for command in msg[msg.find(prefix) + len(prefix):].strip().split("&"):
+            processed = command.strip().split(":")[:-1]
+            print(("Outreach" if outreach else "TJ") + " message received", processed)
+            if processed[0] not in registry.keys():
+                continue
+            if (arg_format := opcodes.ARG_FORMATS[processed[0]]) == opcodes.ASCII:
+                args = [":".join(processed[2:])]  # String may itself contain ":"
+            elif arg_format == opcodes.DESCRIPTOR:  # First argument is a descriptor
+                args = processed[2:3] + [float(s) for s in processed[3:]]
+            else:
+                args = [float(s) for s in processed[2:]]
+            packets.append(FullPacket(processed[0], args, int(processed[1]), outreach=outreach))
+        return packets
 
     @wrap_errors(APRSError)
+    @timed_io
     def write(self, message: str) -> bool:
         """
         Writes the message to the APRS radio through the serial port
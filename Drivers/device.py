@@ -1,8 +1,12 @@
+import time
 from lib.exceptions import wrap_errors, LogicalError
 
 
 class Device:
     SERIAL_CONVERTERS = []
+    # Time to wait after switching on before constructing the driver, in seconds
+    # Drivers which wait for the hardware themselves with readiness probes (see wait_until) set this to 0
+    BOOT_TIME = 0.5
 
     @wrap_errors(LogicalError)
     def __init__(self, sfr):
@@ -26,6 +30,25 @@ class Device:
         """
         pass
 
+    @staticmethod
+    @wrap_errors(LogicalError)
+    def wait_until(probe: callable, timeout: float, interval: float = 0.05, max_interval: float = 1) -> bool:
+        """
+        Polls a readiness probe with exponential backoff until it succeeds, instead of sleeping for a fixed time
+        :param probe: function returning whether the device is ready
+        :param timeout: maximum time to wait, in seconds
+        :param interval: time to wait after the first failed probe, doubled after every failure
+        :param max_interval: longest time to wait between probes
+        :return: whether the probe succeeded before timing out
+        """
+        deadline = time.perf_counter() + timeout
+        while not probe():
+            if (remaining := deadline - time.perf_counter()) <= 0:
+                return False
+            time.sleep(min(interval, remaining))
+            interval = min(interval * 2, max_interval)
+        return True
+
     @wrap_errors(LogicalError)
     def __str__(self):
         return ""
@@ -1,6 +1,7 @@
 from smbus2 import SMBus
 import time
 from lib.exceptions import wrap_errors, EPSError
+from lib.metrics import timed_io
 from Drivers.device import Device
 
 
@@ -188,6 +189,7 @@ class EPS(Device):
         return self.commands["Reset Watchdog"]()
 
     @wrap_errors(EPSError)
+    @timed_io
     def request(self, register, data, length) -> bytes:
         """
         Requests and returns uninterpreted bytes object
@@ -206,6 +208,7 @@ class EPS(Device):
         return result
 
     @wrap_errors(EPSError)
+    @timed_io
     def command(self, register, data) -> bool:
         """
         Sends command to EPS
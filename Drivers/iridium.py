@@ -1,11 +1,14 @@
 import time, datetime
 import math
+import re
 from serial import Serial
 import copy
 from Drivers.transmission_packet import TransmissionPacket, FullPacket
 from lib.exceptions import wrap_errors, IridiumError, LogicalError, InvalidCommandException, \
     NoSignalException
 from Drivers.device import Device
+from lib.metrics import timed_io
+from lib import opcodes
 
 
 # https://www.beamcommunications.com/document/328-iridium-isu-at-command-reference-v5
@@ -34,24 +37,38 @@ class Iridium(Device):
     SERIAL_CONVERTERS = ["UART-RS232"]
     PORT = '/dev/serial0'
     BAUDRATE = 19200
+    BOOT_TIME = 0  # Readiness is probed in __init__ instead
+    BOOT_TIMEOUT = 5  # Longest time to wait for the modem to answer after power on, in seconds
 
     # Maximum permissible data size including descriptor size, in bytes. Hardware limitation should be 340 bytes total
     MAX_DATASIZE = 300
 
     EPOCH = datetime.datetime(2014, 5, 11, 14, 23, 55).timestamp()  # Set epoch date to 5 May, 2014, at 14:23:55 GMT
 
-    ASCII_ARGS = {"ICE", "ZMV"}  # Commands whose arguments should be decoded as ascii
+    # Return code marking a message which holds several encoded packets, see encode_batch
+    # Single packets use return codes 0-3, so this can never be confused with an unbatched message
+    BATCH_CODE = 0x04
+    MAX_BATCH_PACKET = 0xff  # Largest encoded packet which can be framed, since its length takes up one byte
+    # Opcode marking an uplinked message which holds several commands, see decode
+    # Never a valid opcode, since the opcode table (lib.opcodes) has far fewer than 255 commands
+    UPLINK_BATCH_CODE = 0xff
+
+    # Unsolicited result codes, framed as \r\n<code>\r\n like responses, see parse_events
+    EVENTS = ("SBDRING", "+CIEV:")
+    EVENT_PATTERN = re.compile(r"(?:\r\n)?^(SBDRING|\+CIEV:[^\r\n]*)\r\n", re.MULTILINE)
+    MAX_EVENT_LENGTH = 64  # Longest incomplete event held back between reads, anything longer is garbage
+
+    # Serial handle kept open across power cycles. /dev/serial0 is the Pi's own UART, so it stays valid
+    # while the modem and converter are off, and reopening it on every power on is wasted time
+    warm_serial = None
 
     @wrap_errors(IridiumError)
     def __init__(self, state_field_registry):
         super().__init__(state_field_registry)
-        self.serial = Serial(port=self.PORT, baudrate=self.BAUDRATE, timeout=1)  # connect serial
-        while not self.serial.is_open:
-            time.sleep(0.5)
-        
-        # Maps each 3 character string to a number code
-        self.ENCODED_REGISTRY = list(self.sfr.command_executor.primary_registry.keys())
-        self.ENCODED_REGISTRY.insert(0, "GRB")
+        if Iridium.warm_serial is None or not Iridium.warm_serial.is_open:
+            Iridium.warm_serial = Serial(port=self.PORT, baudrate=self.BAUDRATE, timeout=1)  # connect serial
+        self.serial = Iridium.warm_serial
+        self.serial.reset_input_buffer()  # Discard anything left over from the last power cycle
 
         self.GEO_C = lambda: self.request("AT-MSGEO")  # Current geolocation, xyz cartesian
         # return format: <x>, <y>, <z>, <time_stamp>
@@ -85,6 +102,11 @@ class Iridium(Device):
         # be sent after the unit is registered :optional param b: set 1/0 enable/disable
         self.RING_ALERT = lambda b="": self.request(f"AT+SBDMTA{b}")
 
+        # Sets automatic registration on or off. Ring alerts are only routed to the ISU while it's registered, so with
+        # automatic registration on the ISU registers whenever it moves far enough to need to
+        # param mode: 0: disabled, 1: automatic, 2: automatic with ring alert on registration
+        self.AUTO_REGISTER = lambda mode: self.request(f"AT+SBDAREG={mode}")
+
         # doesn't seem relevant to us?
         self.BAT_CHECK = lambda: self.request("AT+CBC")
 
@@ -145,11 +167,31 @@ class Iridium(Device):
         # returns bool if buffer wasnt cleared successfully (1 = error, 0 = successful)
         self.SBD_CLR = lambda type: self.request("AT+SBDD" + str(type))
 
+        # Unsolicited result codes are parsed out of everything read from serial, see parse_events
+        self.unparsed = ""  # End of the last read which may be the start of an event, not returned yet
+        self.signal = 0  # Signal strength from the last +CIEV indication
+        self.ring = False  # Whether a ring alert is waiting to be answered with SBDIXA
+        self.mail_pending = True  # Whether the gateway may be holding MT messages, check once on boot
+        if not self.wait_until(self.ready, self.BOOT_TIMEOUT):
+            raise IridiumError(details="No response after power on")
+        self.RING_ALERT("=1")  # SBDRING whenever an MT message arrives at the gateway
+        self.CIER([1, 1, 1])  # +CIEV:0,<signal> and +CIEV:1,<service> whenever they change
+        self.AUTO_REGISTER(1)
+
     @wrap_errors(IridiumError)
     def terminate(self):
         self.check_buffer()
-        self.SHUTDOWN()
-        self.serial.close()
+        self.SHUTDOWN()  # Serial handle is left open for the next power on, see warm_serial
+
+    @wrap_errors(IridiumError)
+    def ready(self) -> bool:
+        """
+        Readiness probe, whether the modem answers AT with OK
+        """
+        try:
+            return self.request("AT", 0.2).find("OK") != -1
+        except IridiumError:
+            return False
 
     @wrap_errors(LogicalError)
     def __str__(self):
@@ -194,9 +236,9 @@ class Iridium(Device):
         Passively check signal strength, for transmit/receive timing
         """
         raw = self.RSSI()
-        if raw.find("CSQ:") == -1:
-            return 0
-        return int(raw[raw.find("CSQ:") + 4: raw.find("CSQ:") + 5])
+        signal = 0 if raw.find("CSQ:") == -1 else int(raw[raw.find("CSQ:") + 4: raw.find("CSQ:") + 5])
+        self.sfr.signal_predictor.observe(signal)
+        return signal
 
     @wrap_errors(IridiumError)
     def check_signal_passive(self):
@@ -204,9 +246,73 @@ class Iridium(Device):
         Passively check signal strength, for transmit/receive timing
         """
         raw = self.LAST_RSSI()
-        if raw.find("CSQF:") == -1:
-            return 0
-        return int(raw[raw.find("CSQF:") + 5: raw.find("CSQF:") + 6])
+        signal = 0 if raw.find("CSQF:") == -1 else int(raw[raw.find("CSQF:") + 5: raw.find("CSQF:") + 6])
+        self.sfr.signal_predictor.observe(signal)
+        return signal
+
+    @wrap_errors(IridiumError)
+    def parse_events(self, data: str) -> str:
+        """
+        Handles unsolicited result codes in data read from serial, and removes them so responses parse the same
+        whether or not an event arrived in the middle of them
+        SBDRING: an MT message is waiting at the gateway
+        +CIEV:0,<signal>: signal strength changed, mail is checked when signal comes back since ring alerts
+        sent while out of coverage are missed
+        An event split between reads is held back until the rest of it is read
+        :param data: (str) data read from serial
+        :return: (str) data without events
+        """
+        data = self.unparsed + data
+        for event in self.EVENT_PATTERN.findall(data):
+            if event == "SBDRING":
+                self.ring = True
+                self.mail_pending = True
+                continue
+            try:
+                indicator, value = [int(s) for s in event[6:].split(",")[:2]]
+            except ValueError:  # Garbled or truncated, not worth failing the request in progress
+                continue
+            if indicator == 0:
+                if self.signal == 0 and value > 0:
+                    self.mail_pending = True
+                self.signal = value
+                self.sfr.signal_predictor.observe(value)
+        data = self.EVENT_PATTERN.sub("", data)
+        # Hold back the last line if it may be the start of an event, or a carriage return which may start one
+        start = len(data) - 1 if data.endswith("\r") else len(data)
+        if (line_start := data.rfind("\r\n")) != -1 and len(data) - line_start <= self.MAX_EVENT_LENGTH:
+            line = data[line_start + 2:].removesuffix("\r")
+            if any(event.startswith(line) or line.startswith("+CIEV:") for event in self.EVENTS):
+                start = line_start
+        data, self.unparsed = data[:start], data[start:]
+        return data
+
+    @wrap_errors(IridiumError)
+    def end_response(self) -> None:
+        """
+        Drops the line break parse_events held back from the end of the last response, before writing to the modem
+        so it isn't read as the start of the next response. An incomplete event is kept
+        """
+        if self.unparsed.strip() == "":
+            self.unparsed = ""
+
+    @wrap_errors(IridiumError)
+    def check_events(self) -> None:
+        """
+        Parses unsolicited result codes waiting on serial without blocking
+        """
+        if self.serial.in_waiting > 0:
+            self.parse_events(self.serial.read(self.serial.in_waiting).decode("utf-8", errors="ignore"))
+
+    @wrap_errors(IridiumError)
+    def mail_waiting(self) -> bool:
+        """
+        Whether there's reason to believe MT messages are waiting at the gateway:
+        a ring alert was received, signal came back, or the last session reported queued messages
+        :return: (bool) whether next_msg should be run
+        """
+        self.check_events()
+        return self.mail_pending
 
     @wrap_errors(IridiumError)
     def process(self, data, cmd):
@@ -221,28 +327,33 @@ class Iridium(Device):
     def encode(self, packet:TransmissionPacket):
         """
         Encodes string for transmit using numbered codes
+        The encoding is kept on the packet, so measuring it in batch_length and sending it costs one encode
+        :param packet: (TransmissionPacket) packet to encode
+        :return: (list) of bytes
+        """
+        if getattr(packet, "encoded", None) is None:  # Packets saved with sfr.vars before the cache existed lack it
+            packet.encoded = self.encode_packet(packet)
+        return packet.encoded
+
+    @wrap_errors(IridiumError)
+    def encode_packet(self, packet: TransmissionPacket) -> list:
+        """
+        Encodes a packet, without the cache of encode
         :param packet: (TransmissionPacket) packet to encode
         :return: (list) of bytes
         """
-        print(packet)
         encoded = [(packet.response << 1) | packet.numerical] # First byte "return code"
         encoded.append(packet.index) # Second byte index
         date = (packet.timestamp.day << 11) | (packet.timestamp.hour << 6) | packet.timestamp.minute  # third and fourth bytes date
         encoded.append((date >> 8) & 0xff)
         encoded.append(date & 0xff)
         if packet.response:
-            if packet.descriptor in self.ENCODED_REGISTRY:
-                encoded.append(self.ENCODED_REGISTRY.index(packet.descriptor)) # Fifth byte descriptor
-            else:
-                raise LogicalError(details="Invalid descriptor string")
+            encoded.append(opcodes.encode_descriptor(packet.descriptor)) # Fifth byte descriptor
             encoded.append((packet.msn >> 8) & 0xff) # Sixth and Seventh byte msn
             encoded.append(packet.msn & 0xff)
         else:
             if packet.numerical:
-                if packet.descriptor in self.ENCODED_REGISTRY:
-                    encoded.append(self.ENCODED_REGISTRY.index(packet.descriptor)) # Fifth byte descriptor
-                else:
-                    raise LogicalError(details="Invalid descriptor string")
+                encoded.append(opcodes.encode_descriptor(packet.descriptor)) # Fifth byte descriptor
 
         if packet.numerical:
             for n in packet.return_data:
@@ -261,6 +372,8 @@ class Iridium(Device):
                     exp = int(math.floor(math.log10(abs(n))))
                 else:
                     exp = 0
+                # num will always have five digits, with trailing zeros if necessary to fill it in
+                num = abs(int((n / (10 ** exp)) * 10000))
                 if exp < 0:
                     exp = abs(exp)
                     exp &= 0xf  # make sure exp is 4 bits, cut off anything past the 4th
@@ -269,8 +382,6 @@ class Iridium(Device):
                     flt |= 1 << 23
                 else:
                     flt |= (exp & 0xf) << 19  # make sure exp is 4 bits, cut off anything past the 4th, shift left 19
-                # num will always have five digits, with trailing zeros if necessary to fill it in
-                num = abs(int((n / (10 ** exp)) * 10000))
                 if n < 0:
                     num &= 0x3ffff  # make sure num is 18 bits long
                     num = (1 << 18) - num  # twos comp
@@ -285,19 +396,60 @@ class Iridium(Device):
                 encoded.append(byte2)
                 encoded.append(byte3)  # LSB LAST
         else:
-            data = packet.return_data[0].encode("ascii")
+            data = packet.return_data[0]
+            if isinstance(data, str):  # bytes, such as lib.timeseries_codec output, are sent as is
+                data = data.encode("ascii")
             for d in data:
                 encoded.append(d)
         return encoded
 
     @wrap_errors(IridiumError)
-    def decode(self, message):
+    def encode_batch(self, packets: list) -> list:
+        """
+        Encodes several packets into a single message so they can share one SBD session
+        Format: [BATCH_CODE, number of packets, length of packet 1, packet 1..., length of packet 2, packet 2...]
+        See lib/ground_codec.py for the matching decoder
+        :param packets: (list) of TransmissionPackets to encode
+        :return: (list) of bytes
+        """
+        encoded = [self.BATCH_CODE, len(packets)]
+        for packet in packets:
+            raw = self.encode(packet)
+            encoded.append(len(raw))
+            encoded += raw
+        return encoded
+
+    @wrap_errors(IridiumError)
+    def batch_length(self, packets) -> int:
+        """
+        Counts how many packets from the front of a queue fit into a single message with encode_batch
+        Always at least 1, so a packet which can't be batched is still sent on its own
+        :param packets: (iterable) of TransmissionPackets, in transmission order
+        :return: (int) number of packets to send together
+        """
+        count = 0
+        size = 2  # Batch code and packet count
+        for packet in packets:
+            length = len(self.encode(packet))
+            if length > self.MAX_BATCH_PACKET or size + 1 + length > self.MAX_DATASIZE or count == 0xff:
+                break
+            size += 1 + length
+            count += 1
+        return max(count, 1)
+
+    @wrap_errors(IridiumError)
+    def decode(self, message, msn: int) -> list:
         """
-        Decodes received and processed string from SBDRB and converts to string
+        Decodes received and processed string from SBDRB into commands
         Truncates unused bits
         CALL PROCESS BEFORE CALLING DECODE
-        :param message: (list) received list of bytes
-        :return: (tup) decoded command and args
+        Single command format: [opcode, args...], msn is the MTMSN of the message
+        Batch format: [UPLINK_BATCH_CODE, number of commands,
+            opcode 1, msn 1 (2 bytes, MSB first), length of args 1, args 1..., opcode 2, ...]
+        See lib/ground_codec.py for the matching encoders
+        :param message: (list) received list of bytes, including length and checksum
+        :param msn: (int) MTMSN of the message
+        :return: (list) of FullPackets, in the order they should be executed
         """
         length = message[:2]  # check length and checksum against message length and sum
         length = length[1] + (length[0] << 8)
@@ -308,31 +460,49 @@ class Iridium(Device):
 
         if checksum != actual_checksum or length != len(msg):
             raise IridiumError(details="Incorrect checksum/length")
-        if msg[0] < 0 or msg[0] >= len(self.ENCODED_REGISTRY):
+        if msg[0] != self.UPLINK_BATCH_CODE:
+            return [FullPacket(*self.decode_command(msg[0], msg[1:]), msn)]
+        packets = []
+        position = 2
+        for _ in range(msg[1]):
+            opcode, command_msn, arglen = msg[position], (msg[position + 1] << 8) | msg[position + 2], msg[position + 3]
+            packets.append(FullPacket(*self.decode_command(opcode, msg[position + 4:position + 4 + arglen]),
+                                      command_msn))
+            position += 4 + arglen
+        if position != len(msg):
+            raise IridiumError(details="Incorrect batch length")
+        return packets
+
+    @wrap_errors(IridiumError)
+    def decode_command(self, opcode: int, data: list) -> tuple:
+        """
+        Decodes the descriptor and arguments of a single command
+        :param opcode: (int) opcode of command, see lib.opcodes
+        :param data: (list) encoded arguments
+        :return: (tup) decoded command and args
+        """
+        if (decoded := opcodes.decode_descriptor(opcode)) is None:
             raise InvalidCommandException(details="Invalid command received")
-        decoded = self.ENCODED_REGISTRY[msg[0]]
         args = []
 
-        if decoded in Iridium.ASCII_ARGS:
-            args = ["".join([chr(i) for i in msg[1:]])]
+        if opcodes.ARG_FORMATS[decoded] == opcodes.ASCII:
+            args = ["".join([chr(i) for i in data])]
         else:
-            for i in range(1, len(msg) - 2, 3):
-                num = (msg[i] << 16) | (msg[i + 1] << 8) | (msg[i + 2])  # msb first
+            for i in range(0, len(data) - 2, 3):
+                num = (data[i] << 16) | (data[i + 1] << 8) | (data[i + 2])  # msb first
                 exp = num >> 19  # extract exponent
-                if exp & (1 << 4) == 1:  # convert twos comp
-                    exp &= 0x10  # truncate first bit
-                    exp -= (1 << 4)
+                if exp & (1 << 4):  # convert twos comp
+                    exp -= (1 << 5)
                 coef = num & 0x7ffff  # extract coefficient
-                if coef & (1 << 18) == 1:  # convert twos comp
-                    coef &= 0x3ffff  # truncate first bit
-                    coef -= (1 << 18)
+                if coef & (1 << 18):  # convert twos comp
+                    coef -= (1 << 19)
                 if coef != 0:
                     coef /= 10 ** int(math.log10(abs(coef)))
                 args.append(coef * 10 ** exp)
-        if decoded == "ARS":
-            if args[0] < 0 or args[0] >= len(self.ENCODED_REGISTRY):
+        if opcodes.ARG_FORMATS[decoded] == opcodes.DESCRIPTOR:
+            if len(args) == 0 or (descriptor := opcodes.decode_descriptor(int(args[0]))) is None:
                 raise InvalidCommandException(details="Invalid command received")
-            args[0] = self.ENCODED_REGISTRY[int(args[0])]
+            args[0] = descriptor
         return (decoded, args)
 
     @staticmethod
@@ -361,6 +531,7 @@ class Iridium(Device):
             for _ in range(len(ls)):
                 result[_].return_data = ls[_]
                 result[_].index = _
+                result[_].encoded = None
         else:
             data = packet.return_data[0]
             if len(data) == 0:
@@ -370,8 +541,24 @@ class Iridium(Device):
             for _ in range(len(ls)):
                 result[_].return_data = [ls[_]]
                 result[_].index = _
+                result[_].encoded = None
         return result
 
+    @staticmethod
+    @wrap_errors(LogicalError)
+    def encoded_size(count: int, numerical: bool, response: bool = True) -> int:
+        """
+        Projects total encoded size of a packet after split_packet, without building it
+        :param count: (int) number of values for numerical packets, characters for string packets
+        :param numerical: (bool) whether packet is numerical
+        :param response: (bool) whether packet is a response to a command
+        :return: (int) total bytes over all split packets
+        """
+        header = 7 if response else (5 if numerical else 4)  # Same as DESCRIPTOR_LEN in split_packet
+        item = 3 if numerical else 1
+        capacity = (Iridium.MAX_DATASIZE - header) // item  # Items per split packet
+        return max(1, math.ceil(count / capacity)) * header + count * item
+
     @wrap_errors(IridiumError)
     def transmit(self, packet: TransmissionPacket, discardmtbuf=False) -> bool:
         """
@@ -384,6 +571,32 @@ class Iridium(Device):
         :return: (bool) transmission successful
         """
         print("Transmitting " + str(packet))
+        return self.transmit_encoded(self.encode(packet), discardmtbuf)
+
+    @wrap_errors(IridiumError)
+    def transmit_batch(self, packets: list, discardmtbuf=False) -> bool:
+        """
+        Transmits several packets in a single SBD session
+        Use batch_length to make sure the packets fit in one message
+        :param packets: (list) of TransmissionPackets to transmit
+        :param discardmtbuf: (bool) see transmit
+        :return: (bool) transmission successful
+        """
+        if len(packets) == 1:  # Don't add framing overhead to a single packet
+            return self.transmit(packets[0], discardmtbuf)
+        print(f"Transmitting batch of {len(packets)} packets")
+        return self.transmit_encoded(self.encode_batch(packets), discardmtbuf)
+
+    @wrap_errors(IridiumError)
+    def transmit_encoded(self, raw: list, discardmtbuf=False) -> bool:
+        """
+        Loads an encoded message into MO buffer, then transmits
+        If a message has been received, read it into SFR
+        Clear buffers once done
+        :param raw: (list) of encoded bytes
+        :param discardmtbuf: (bool) see transmit
+        :return: (bool) transmission successful
+        """
         stat = self.SBD_STATUS()
         ls = self.process(stat, "SBDS").split(",")
         if int(ls[2]) == 1:  # If message in MT, and discardbuf False, save MT to sfr
@@ -391,7 +604,7 @@ class Iridium(Device):
                 self.check_buffer()
         if self.SBD_CLR(2).find("0\r\n\r\nOK") == -1:
             raise IridiumError(details="Error clearing buffers")
-        result = self.transmit_raw(raw := self.encode(packet))
+        result = self.transmit_raw(raw)
         self.sfr.logs["transmission"].write({  # Log transmission
             "ts0": (t := time.time()) // 100000,
             "ts1": int(t % 100000),
@@ -417,28 +630,31 @@ class Iridium(Device):
                     raise IridiumError(details=f"Error transmitting buffer, error code {result[0]}")
         if result[2] == 1:
             self.check_buffer()
+        if result[5] > 0:  # More messages waiting at gateway
+            self.mail_pending = True
         if self.SBD_CLR(2).find("0\r\n\r\nOK") == -1:
             raise IridiumError(details="Error clearing buffers")
         return True
 
     @wrap_errors(IridiumError)
+    @timed_io
     def transmit_raw(self, message):
         """
         Transmits raw message using SBDWB, ignore MT buffer
         Use as a helper function for transmit
         :param message: (list) message, of encoded bytes.
         """
-        rssi = self.RSSI()
-        if rssi.find("CSQ:0") != -1 or rssi.find("OK") == -1:  # check signal strength first
+        if self.check_signal_active() == 0:  # check signal strength first
             raise NoSignalException(details="No Signal")
         length = len(message)
         checksum = sum(message) & 0xffff
-        message.append(checksum >> 8)  # add checksum bytes
-        message.append(checksum & 0xff)
+        # New list, message may be the encoding cached on a packet which is sent again if this attempt fails
+        message = message + [checksum >> 8, checksum & 0xff]  # add checksum bytes
         self.SBD_WB(length)  # Specify bytes to write
         time.sleep(1)  # 1 second to respond
         if self.read().find("READY") == -1:
             raise IridiumError(details="Serial Timeout")
+        self.end_response()
         self.serial.write(message)
         time.sleep(1)  # 1 second to respond
         result = ""
@@ -457,7 +673,9 @@ class Iridium(Device):
         self.SBD_TIMEOUT(60)  # 60 second timeout for transmit
         sttime = time.perf_counter()
         result = [int(s) for s in self.process(self.SBD_INITIATE_EX(), "SBDIX").split(",")]
-        self.sfr.vars.BATTERY_CAPACITY_INT -= (time.perf_counter() - sttime) * Iridium.AVG_TRANSMISSION_POWER
+        energy = (time.perf_counter() - sttime) * Iridium.AVG_TRANSMISSION_POWER
+        self.sfr.vars.BATTERY_CAPACITY_INT -= energy
+        self.sfr.metrics.add_transmission(len(message), energy)
         return result
 
     @wrap_errors(IridiumError)
@@ -468,62 +686,55 @@ class Iridium(Device):
         stat = self.SBD_STATUS()
         ls = self.process(stat, "SBDS").split(",")
         if int(ls[2]) == 1:  # Save MT to sfr
-            try:
-                self.SBD_RB()
-                raw = self.serial.read(50)
-                t = time.perf_counter()
-                while raw.find(b'OK') == -1:
-                    if time.perf_counter() - t > 5:
-                        raise IridiumError(details="Serial Timeout")
-                    raw += self.serial.read(50)
-                raw = raw[raw.find(b'SBDRB\r\n') + 7:].split(b'\r\nOK')[0]
-                self.sfr.vars.command_buffer.append(FullPacket(*self.decode(list(raw)), int(ls[3])))
-                print("Received message " + self.sfr.vars.command_buffer[-1].descriptor)
-            except Exception as e:
-                self.sfr.vars.command_buffer.append(FullPacket("GRB", [repr(e)], int(ls[3])))
-                print("Garbled message received " + repr(e))
-                # Append garbled message indicator and msn, args set to exception string to debug
+            self.read_mt(int(ls[3]))
         if self.SBD_CLR(2).find("0\r\n\r\nOK") == -1:
             raise IridiumError(details="Error clearing buffers")
 
+    @wrap_errors(IridiumError)
+    def read_mt(self, msn: int) -> None:
+        """
+        Reads the message in the MT buffer into the command buffer
+        :param msn: (int) MTMSN of the message
+        """
+        try:
+            self.SBD_RB()
+            raw = self.serial.read(50)
+            t = time.perf_counter()
+            while raw.find(b'OK') == -1:
+                if time.perf_counter() - t > 5:
+                    raise IridiumError(details="Serial Timeout")
+                raw += self.serial.read(50)
+            raw = raw[raw.find(b'SBDRB\r\n') + 7:].split(b'\r\nOK')[0]
+            for packet in self.decode(list(raw), msn):
+                self.sfr.vars.command_buffer.append(packet)
+                print("Received message " + packet.descriptor)
+        except Exception as e:
+            self.sfr.vars.command_buffer.append(FullPacket("GRB", [repr(e)], msn))
+            print("Garbled message received " + repr(e))
+            # Append garbled message indicator and msn, args set to exception string to debug
+
     @wrap_errors(IridiumError)
     def next_msg(self):
         """
         Stores next received messages in sfr
+        Only starts sessions while the gateway is reporting queued messages, see mail_waiting
         """
         print("Checking Iridium Messages")
         self.check_buffer()
         self.SBD_TIMEOUT(60)
-        time.sleep(1)
-        result = [0, 0, 0, 0, 0, 1]
-        lastqueued = []
-        while result[5] >= 0:
-            result = [int(s) for s in self.process(self.SBD_INITIATE_EX(), "SBDIX").split(",")]
-            lastqueued.append(result[5])
-            if len(lastqueued) > 3 and sum(lastqueued[-3:]) / 3 == lastqueued[-1]:
-                print("GSS Not Changing, aborting")
-                break  # If GSS queue is not changing, don't bother to keep trying, just break
-            if result[2] == 1:
-                try:
-                    self.SBD_RB()
-                    raw = self.serial.read(50)
-                    t = time.perf_counter()
-                    while raw.find(b'OK') == -1:
-                        if time.perf_counter() - t > 5:
-                            raise IridiumError(details="Serial Timeout")
-                        raw += self.serial.read(50)
-                    raw = raw[raw.find(b'SBDRB\r\n') + 7:].split(b'\r\nOK')[0]
-                    self.sfr.vars.command_buffer.append(FullPacket(*self.decode(list(raw)), int(result[3])))
-                    print("Received message " + self.sfr.vars.command_buffer[-1].descriptor)
-                except Exception as e:
-                    self.sfr.vars.command_buffer.append(FullPacket("GRB", [repr(e)], int(result[3])))  
-                    print("Garbled message received " + repr(e))
-                    # Append garbled message indicator and msn
-            elif result[2] == 0:
+        self.mail_pending = False
+        while True:
+            # SBDIXA answers a ring alert, which clears it at the gateway
+            result = [int(s) for s in self.process(self.SBD_INITIATE_EX("A" if self.ring else ""), "SBDIX").split(",")]
+            if result[2] == 2:  # Session failed, try again next time
+                self.mail_pending = True
+                break
+            self.ring = False
+            if result[2] == 0:  # Nothing received
                 break
-            elif result[2] == 2:
+            self.read_mt(result[3])
+            if result[5] == 0:  # Nothing left at the gateway
                 break
-            time.sleep(2.5)
         if self.SBD_CLR(2).find("0\r\n\r\nOK") == -1:
             raise IridiumError(details="Error clearing buffers")
 
@@ -568,6 +779,7 @@ class Iridium(Device):
         return (lat, lon, alt)
 
     @wrap_errors(IridiumError)
+    @timed_io
     def request(self, command: str, timeout=0.5) -> str:
         """
         Requests information from Iridium and returns unprocessed response
@@ -589,16 +801,19 @@ class Iridium(Device):
         raise IridiumError(details="Incomplete response")
 
     @wrap_errors(IridiumError)
+    @timed_io
     def write(self, command: str) -> bool:
         """
         Write a command to the serial port.
         :param command: (str) Command to write
         :return: (bool) if the serial write worked
         """
+        self.end_response()
         self.serial.write((command + "\r\n").encode("utf-8"))
         return True
 
     @wrap_errors(IridiumError)
+    @timed_io
     def read(self) -> str:
         """
         Reads in as many available bytes as it can if timeout permits.
@@ -613,4 +828,4 @@ class Iridium(Device):
             if next_byte == bytes():
                 break
             output += next_byte
-        return output.decode("utf-8")
+        return self.parse_events(output.decode("utf-8"))
@@ -1,5 +1,6 @@
 from lib.exceptions import wrap_errors, LogicalError
 import datetime
+import base64
 
 
 class TransmissionPacket:
@@ -15,6 +16,7 @@ class TransmissionPacket:
         self.return_data = []
         self.timestamp = None
         self.index = 0
+        self.encoded = None  # Cached by Iridium.encode, packets aren't changed once they're ready to transmit
         
     def __str__(self):
         return "" # Overridden by subclasses
@@ -41,6 +43,9 @@ class FullPacket(TransmissionPacket): # Use this for anything that responds to a
     @wrap_errors(LogicalError)
     def __str__(self):
         if self.response and not self.numerical: # String in response to a received command, will still contain descriptor for clarity's sake
+            if isinstance(self.return_data[0], bytes):  # Binary responses are base64 encoded for text radios
+                return f"{(self.response << 1) | self.numerical}:{self.index}:{self.timestamp.day}-\
+                    {self.timestamp.hour}-{self.timestamp.minute}:{self.descriptor}:{self.msn}:{base64.b64encode(self.return_data[0]).decode('ascii')}:"
             return f"{(self.response << 1) | self.numerical}:{self.index}:{self.timestamp.day}-\
                 {self.timestamp.hour}-{self.timestamp.minute}:{self.descriptor}:{self.msn}:{self.return_data[0]}:"
         return f"{(self.response << 1) | self.numerical}:{self.index}:{self.timestamp.day}-\
@@ -1,3 +1,4 @@
+import time
 from Drivers.transmission_packet import UnsolicitedData
 from MainControlLoop.Mode.mode import Mode
 from lib.exceptions import wrap_errors, LogicalError
@@ -9,6 +10,8 @@ class Charging(Mode):
     This mode allows us to charge our battery while still maintaining contact with the ground
     Only the primary radio is on
     """
+    LISTEN_TIME = 5  # Time APRS is kept on after the heartbeat to receive uplinks, in seconds
+
     @wrap_errors(LogicalError)
     def __init__(self, sfr, mode: type):
         """
@@ -26,7 +29,10 @@ class Charging(Mode):
             """
             Redefines poll_iridium function in Mode by decorating superclass method
             Powers Iridium on while polling and switches off when not in use
+            Doesn't power on at all if no signal window is predicted
             """
+            if not self.sfr.signal_predictor.window_open():
+                return False
             self.sfr.power_on("Iridium")
             self.sfr.devices["Iridium"].check_signal_active()  # Updates passive signal strength for superclass method
             result = super(Charging, self).poll_iridium()  # Call superclass method
@@ -65,11 +71,13 @@ class Charging(Mode):
     def poll_aprs(self) -> None:
         """
         Poll the APRS once per orbit
-        Transmits heartbeat ping and reads messages
+        Transmits heartbeat ping, then listens for LISTEN_TIME and reads messages
+        APRS is off the rest of the orbit, so this is the only time uplinks can be received
         """
         self.sfr.power_on("APRS")
         print("Transmitting heartbeat...")
         self.sfr.command_executor.GPL(UnsolicitedData("GPL"))  # Transmit heartbeat immediately
+        time.sleep(self.LISTEN_TIME)  # Reader thread collects messages meanwhile
         self.read_aprs()
         self.sfr.power_off("APRS")
 
@@ -48,8 +48,7 @@ class Mode:
         if any([(i in self.sfr.vars.LOCKED_OFF_DEVICES) for i in enabled_components]):
             return False
         self.sfr.all_off(exceptions=enabled_components)
-        for component in enabled_components:
-            self.sfr.power_on(component)
+        self.sfr.power_on_many(enabled_components)
         return True
 
     @wrap_errors(LogicalError)
@@ -71,8 +70,9 @@ class Mode:
         Additionally, it resets EPS watchdog and transmits heartbeat
         """
         self.sfr.eps.commands["Reset Watchdog"]()  # ensures EPS doesn't reboot
-        # If enough time has passed and primary radio is Iridium
-        if self.iridium_clock.time_elapsed() and self.sfr.vars.PRIMARY_RADIO == "Iridium":
+        # If primary radio is Iridium and enough time has passed, or a ring alert says messages are waiting
+        if self.sfr.vars.PRIMARY_RADIO == "Iridium" and (self.iridium_clock.time_elapsed() or (
+                self.sfr.devices["Iridium"] is not None and self.sfr.devices["Iridium"].mail_waiting())):
             try:
                 self.poll_iridium()  # Poll Iridium
             except NoSignalException:
@@ -81,7 +81,6 @@ class Mode:
         if self.heartbeat_clock.time_elapsed():  # Heartbeat pings
             self.heartbeat()
             self.heartbeat_clock.update_time()
-        self.read_aprs()  # Read from APRS every cycle
 
     @wrap_errors(LogicalError)
     def poll_iridium(self) -> bool:
@@ -95,16 +94,20 @@ class Mode:
         """
         if self.sfr.devices["Iridium"] is None:  # Don't run if Iridium is powered off (should never happen)
             return False
+        if not self.sfr.signal_predictor.window_open():  # Don't waste power on a session likely to find no signal
+            print("No Iridium window predicted, next in", self.sfr.signal_predictor.next_window(), "seconds")
+            return False
 
         signal = self.sfr.devices["Iridium"].check_signal_passive()
         print("Iridium signal strength: ", signal)
         if signal < 1:
             return False
 
-        startlen = len(self.sfr.vars.command_buffer)
-        self.sfr.devices["Iridium"].next_msg()  # Read from iridium
-        if len(self.sfr.vars.command_buffer) > startlen:
-            self.sfr.vars.LAST_IRIDIUM_RECEIVED = time.time()  # Update last message received
+        if self.sfr.devices["Iridium"].mail_waiting():  # Only start receive sessions when messages are waiting
+            startlen = len(self.sfr.vars.command_buffer)
+            self.sfr.devices["Iridium"].next_msg()  # Read from iridium
+            if len(self.sfr.vars.command_buffer) > startlen:
+                self.sfr.vars.LAST_IRIDIUM_RECEIVED = time.time()  # Update last message received
 
         self.sfr.command_executor.transmit_queue()  # Attempt to transmit transmission queue
 
@@ -147,18 +150,17 @@ class Mode:
         :return: ALWAYS TRUE, a problem will result in an exception being raised
         :rtype: bool
         """
-        # Iterate over all devices which aren't locked off
-        for device in filter(lambda i: i not in self.sfr.vars.LOCKED_OFF_DEVICES, self.sfr.devices.keys()):
-            if self.sfr.devices[device] is None:
-                self.sfr.power_on(device)
-                if device == "Iridium": 
-                    self.sfr.devices[device].SBD_STATUS()
-                self.sfr.devices[device].functional()
-                self.sfr.power_off(device)
-            else:
-                if device == "Iridium": 
-                    self.sfr.devices[device].SBD_STATUS()
-                self.sfr.devices[device].functional()
+        # All devices which aren't locked off are checked at once, devices which were off are switched back off after
+        devices = [i for i in self.sfr.devices.keys() if i not in self.sfr.vars.LOCKED_OFF_DEVICES]
+        was_off = [i for i in devices if self.sfr.devices[i] is None]
+        self.sfr.power_on_many(was_off)
+
+        def check(device: str) -> None:
+            if device == "Iridium":
+                self.sfr.devices[device].SBD_STATUS()
+            self.sfr.devices[device].functional()
+        self.sfr.run_concurrently(check, devices)
+        self.sfr.power_off_many(was_off)
         return True
 
     @wrap_errors(LogicalError)
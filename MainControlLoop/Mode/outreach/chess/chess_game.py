@@ -1,6 +1,5 @@
 import chess
-import chess.engine
-from stockfish import Stockfish
+from MainControlLoop.Mode.outreach.chess.engine import ChessEngine
 from lib.exceptions import wrap_errors, LogicalError
 
 
@@ -40,13 +39,16 @@ class ChessGame:
         self.board.set_fen(fen)
 
     @wrap_errors(LogicalError)
-    def get_best_move(self):
-        stockfish = Stockfish(path='MainControlLoop/Mode/outreach/chess/stockfish_exe',
-                              parameters={"Minimum Thinking Time": 5})
-        stockfish.set_fen_position(self.board.fen())
-        move = stockfish.get_best_move_time(self.sfr.vars.OUTREACH_MAX_CALCULATION_TIME)
-        move = self.board.parse_san(move)
-        return move
+    def get_best_move(self, time_limit: float = None):
+        """
+        :param time_limit: time to think in seconds, defaults to OUTREACH_MAX_CALCULATION_TIME
+        :type time_limit: float
+        :return: best move
+        :rtype: :class: 'chess.Move'
+        """
+        if time_limit is None:
+            time_limit = self.sfr.vars.OUTREACH_MAX_CALCULATION_TIME
+        return self.board.parse_uci(ChessEngine.best_move(self.game_id, self.board.fen(), time_limit))
 
     @wrap_errors(LogicalError)
     def push(self, move: chess.Move):
@@ -0,0 +1,62 @@
+from stockfish import Stockfish
+from lib.exceptions import wrap_errors, LogicalError
+
+
+class ChessEngine:
+    """
+    Keeps one Stockfish process running while in Outreach mode, shared by every ChessGame
+    Starting Stockfish (loading the binary, allocating hash, UCI handshake) costs more than a move, so it's done once
+    Hash is kept between moves of the same game, and cleared with ucinewgame when a different game is played
+    """
+    PATH = 'MainControlLoop/Mode/outreach/chess/stockfish_exe'
+    PARAMETERS = {
+        "Threads": 1,  # Leave the Pi's other cores to the rest of the flight software
+        "Hash": 16,  # MB
+        "Minimum Thinking Time": 5,
+    }
+    engine = None  # Running Stockfish, None until the first move or after shutdown
+    last_game_id = None  # Game whose position the engine searched last
+
+    @classmethod
+    @wrap_errors(LogicalError)
+    def get(cls) -> Stockfish:
+        """
+        Running engine, started if needed
+        """
+        if cls.engine is None:
+            cls.engine = Stockfish(path=cls.PATH, parameters=cls.PARAMETERS)
+            cls.last_game_id = None
+        return cls.engine
+
+    @classmethod
+    @wrap_errors(LogicalError)
+    def best_move(cls, game_id: str, fen: str, time_limit: float) -> str:
+        """
+        Searches a position
+        :param game_id: game the position is from
+        :type game_id: str
+        :param fen: position
+        :type fen: str
+        :param time_limit: time to think, in seconds
+        :type time_limit: float
+        :return: best move in uci notation, None if there are no legal moves
+        :rtype: str
+        """
+        try:
+            engine = cls.get()
+            engine.set_fen_position(fen, send_ucinewgame_token=game_id != cls.last_game_id)
+            cls.last_game_id = game_id
+            return engine.get_best_move_time(int(time_limit * 1000))  # Takes milliseconds
+        except Exception:
+            cls.shutdown()  # Engine may be in an unknown state, start a new one next time
+            raise
+
+    @classmethod
+    @wrap_errors(LogicalError)
+    def shutdown(cls) -> None:
+        """
+        Stops the engine, if it's running
+        """
+        engine, cls.engine = cls.engine, None
+        cls.last_game_id = None
+        del engine  # Stockfish sends quit and waits for the process to exit when deleted
@@ -0,0 +1,100 @@
+import random
+from array import array
+from lib.exceptions import wrap_errors, LogicalError
+
+
+class JokeCorpus:
+    """
+    One type of joke, read from disk once and kept in memory as the file's bytes plus the offsets of each line
+    Picking a joke is O(1) and only decodes that one line
+    With rotation, every joke is told once, in random order, before any is repeated
+    """
+    PATHS = {
+        "Joke": "MainControlLoop/Mode/outreach/jokes/jokes.txt",  # dad joke
+        "Pickup": "MainControlLoop/Mode/outreach/jokes/pickup.txt",  # pickup line
+        "Inside": "MainControlLoop/Mode/outreach/jokes/inside.txt"  # insider joke
+    }
+    ROTATE = True  # Default for pick, whether to avoid repeats until every joke has been told
+    loaded = {}  # Joke type -> JokeCorpus, shared by every JokesGame and heartbeat
+
+    @wrap_errors(LogicalError)
+    def __init__(self, path: str):
+        """
+        :param path: text file, one joke per line, blank lines are skipped
+        :type path: str
+        """
+        with open(path, "rb") as f:
+            self.data = f.read()
+        self.starts = array("I")  # Byte offset where each joke starts
+        self.ends = array("I")  # Byte offset where each joke ends, excluding newline
+        start = 0
+        while start < len(self.data):
+            if (end := self.data.find(b"\n", start)) == -1:
+                end = len(self.data)
+            if len(self.data[start:end].strip()) > 0:
+                self.starts.append(start)
+                self.ends.append(end)
+            start = end + 1
+        if len(self.starts) == 0:
+            raise LogicalError(details=f"No jokes in {path}")
+        self.rotation = []  # Indices of jokes not told yet this rotation
+
+    @classmethod
+    @wrap_errors(LogicalError)
+    def get(cls, joke_type: str):
+        """
+        Corpus of a joke type, read from disk the first time it's needed
+        :param joke_type: key of PATHS
+        :type joke_type: str
+        :rtype: JokeCorpus
+        """
+        if (corpus := cls.loaded.get(joke_type)) is None:
+            corpus = cls.loaded[joke_type] = cls(cls.PATHS[joke_type])
+        return corpus
+
+    @classmethod
+    @wrap_errors(LogicalError)
+    def load_all(cls) -> None:
+        """
+        Reads every corpus now, so later picks never touch the filesystem
+        """
+        for joke_type in cls.PATHS:
+            cls.get(joke_type)
+
+    @classmethod
+    @wrap_errors(LogicalError)
+    def random_joke(cls) -> str:
+        """
+        :return: joke of a random type
+        :rtype: str
+        """
+        return cls.get(random.choice(list(cls.PATHS))).pick()
+
+    @wrap_errors(LogicalError)
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    @wrap_errors(LogicalError)
+    def line(self, index: int) -> str:
+        """
+        :param index: index of joke, from 0 to len - 1
+        :type index: int
+        :return: joke, without surrounding whitespace
+        :rtype: str
+        """
+        return self.data[self.starts[index]:self.ends[index]].decode("utf-8").strip()
+
+    @wrap_errors(LogicalError)
+    def pick(self, rotate: bool = ROTATE) -> str:
+        """
+        :param rotate: whether to avoid repeating jokes until every one has been told
+        :type rotate: bool
+        :return: random joke
+        :rtype: str
+        """
+        if not rotate:
+            return self.line(random.randrange(len(self)))
+        if len(self.rotation) == 0:
+            self.rotation = list(range(len(self)))
+            random.shuffle(self.rotation)
+        return self.line(self.rotation.pop())
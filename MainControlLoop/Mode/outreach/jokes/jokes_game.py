@@ -1,5 +1,6 @@
 import random
 
+from MainControlLoop.Mode.outreach.jokes.joke_corpus import JokeCorpus
 from lib.exceptions import wrap_errors, LogicalError
 
 
@@ -8,12 +9,7 @@ class JokesGame:
     def __init__(self, sfr, game_id):
         self.sfr = sfr
         self.game_id = game_id
-        self.joke_type = None
-        self.joke_dict = {
-            "Joke": "MainControlLoop/Mode/outreach/jokes/jokes.txt",  # dad joke
-            "Pickup": "MainControlLoop/Mode/outreach/jokes/pickup.txt",  # pickup line
-            "Inside": "MainControlLoop/Mode/outreach/jokes/inside.txt"  # insider joke
-        }
+        self.joke_type = None  # Key of JokeCorpus.PATHS
         self.joke = "No Joke Generated Yet :("
 
     @wrap_errors(LogicalError)
@@ -22,14 +18,12 @@ class JokesGame:
 
     @wrap_errors(LogicalError)
     def get_joke(self):
-        with open(self.joke_dict[self.joke_type], "r") as f:
-            lines = f.readlines()
-            return random.choice(lines).strip()
+        return JokeCorpus.get(self.joke_type).pick()
 
     @wrap_errors(LogicalError)
     def set_game(self, joke_type):
         if joke_type == "Random":
-            self.joke_type = random.choice(list(self.joke_dict.keys()))
+            self.joke_type = random.choice(list(JokeCorpus.PATHS))
         else:
             self.joke_type = joke_type
 
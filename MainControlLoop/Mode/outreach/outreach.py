@@ -1,11 +1,7 @@
 from Drivers.transmission_packet import UnsolicitedString
-from MainControlLoop.Mode.outreach.chess.chess_game import ChessGame
-from MainControlLoop.Mode.outreach.tictactoe.tictactoe_game import TicTacToeGame
-from MainControlLoop.Mode.outreach.ultimate_tictactoe.ultimate_game import UltimateTicTacToeGame
-from MainControlLoop.Mode.outreach.jokes.jokes_game import JokesGame
+from MainControlLoop.Mode.outreach.worker import OutreachWorker
 from MainControlLoop.Mode.mode import Mode
 from lib.exceptions import wrap_errors, LogicalError
-import time
 
 
 class Outreach(Mode):
@@ -13,6 +9,7 @@ class Outreach(Mode):
     This mode interfaces with a web server on the ground, allowing anyone around the world to play games with REVERB
     Currently available games: chess, jokes, tictactoe, ultimate tictactoe
     """
+    FINISH_TIMEOUT = 30  # Time to wait for unanswered games when leaving the mode, in seconds
 
     @wrap_errors(LogicalError)
     def __init__(self, sfr):
@@ -22,8 +19,9 @@ class Outreach(Mode):
         """
         super().__init__(sfr)
         self.sfr = sfr
-        self.string_game_queue = []  # string format = game;board_string;game_id
-        self.object_game_queue = []
+        # string format = game;board_string;game_id, starting with games left from the last time in Outreach
+        self.string_game_queue, self.sfr.vars.outreach_games = self.sfr.vars.outreach_games, []
+        self.worker = OutreachWorker(sfr)  # Solves games in its own process
         # games are "TicTacToe", "Chess"
 
     @wrap_errors(LogicalError)
@@ -58,55 +56,29 @@ class Outreach(Mode):
             return self
 
     @wrap_errors(LogicalError)
-    def decode_game_queue(self):
+    def execute_cycle(self) -> None:
         """
-        Turns encoded strings in game_queue, returns the list of game objects.
-        Clears game_queue.
-        :return: list of game objects
-        :rtype: list
+        Execute a single cycle of Outreach mode
+        Send game strings received since last cycle to the worker, and transmit games it has finished
+        Never waits for games to be solved
         """
         for encoded_string in self.string_game_queue:
-            game, board_string, game_id = encoded_string.split(";")
-
-            if game == "TicTacToe":
-                obj = TicTacToeGame(self.sfr, game_id)
-                obj.set_game(board_string)
-                self.object_game_queue.append(obj)
-
-            elif game == "Chess":
-                obj = ChessGame(self.sfr, game_id)
-                obj.set_game(board_string)
-                self.object_game_queue.append(obj)
-
-            elif game == "Ultimate":
-                obj = UltimateTicTacToeGame(self.sfr, game_id)
-                obj.set_game(board_string)
-                self.object_game_queue.append(obj)
-
-            elif game == "Jokes":
-                obj = JokesGame(self.sfr, game_id)
-                obj.set_game(board_string)
-                self.object_game_queue.append(obj)
+            self.worker.submit(encoded_string)
+        self.string_game_queue = []
+        self.transmit_results(self.worker.results())
 
     @wrap_errors(LogicalError)
-    def execute_cycle(self) -> None:
+    def transmit_results(self, results: list) -> None:
         """
-        Execute a single cycle of Outreach mode
-        Decode game queue and get game objects
-        For each game in the queue, get best AI move and transmit updated game
-        Computing time for executing queue
-        """
-        self.decode_game_queue()
-        time_started = time.time()
-        while len(self.object_game_queue) > 0:
-            game = self.object_game_queue.pop()
-            print(game)
-            ai_move = game.get_best_move()
-            print(f"AIMOVE: {ai_move}")
-            game.push(ai_move)
-            self.transmit_string(str(game))
-            if time.time() - 60 > time_started:  # limit compute time per cycle
-                break
+        Transmit games finished by the worker
+        :param results: (game_id, updated game string, None) or (game_id, None, error string) of each game
+        :type results: list
+        """
+        for game_id, game_string, error in results:
+            if error is not None:
+                print(f"Outreach game {game_id} failed: {error}")
+                continue
+            self.transmit_string(game_string)
 
     @wrap_errors(LogicalError)
     def transmit_string(self, message: str):
@@ -121,6 +93,13 @@ class Outreach(Mode):
     @wrap_errors(LogicalError)
     def terminate_mode(self) -> None:
         """
-        Make one final move on all games in buffer and transmit results
+        Wait up to FINISH_TIMEOUT for the worker to answer every game and transmit them, then stop it,
+        with the chess engine it keeps running
+        Games still unanswered are kept in sfr for the next time Outreach mode is run, so no move is lost
         """
-        self.execute_cycle()  # finish all games in buffer
+        try:
+            self.execute_cycle()
+            self.transmit_results(self.worker.finish(self.FINISH_TIMEOUT))
+        finally:
+            self.sfr.vars.outreach_games += self.string_game_queue + self.worker.stop()
+            self.string_game_queue = []
@@ -0,0 +1,85 @@
+import time
+from lib.exceptions import wrap_errors, LogicalError
+
+
+class GameScheduler:
+    """
+    Decides which queued outreach games get a move each cycle, and how long each may think
+    Instant games (tictactoe table lookups, jokes) always get their move
+    Anytime games (searches which return their best move so far when time runs out) share the rest of CYCLE_BUDGET,
+    oldest first, each getting a slice proportional to its type's weight and how long it's been waiting
+    Games which don't fit wait for the next cycle, so one cycle never takes much longer than CYCLE_BUDGET
+    """
+    CYCLE_BUDGET = 30  # Seconds of computation per cycle
+    MIN_SLICE = 1  # Least time worth starting a search with, in seconds
+    WEIGHTS = {  # Share of the budget of each anytime game type, types not listed are instant
+        "Chess": 2,
+        "Ultimate": 1,
+    }
+    AGE_WEIGHT = 1 / 60  # Extra share per second spent waiting, relative to a game queued just now
+
+    @wrap_errors(LogicalError)
+    def __init__(self, max_time: float):
+        """
+        :param max_time: most time one game may think, in seconds (OUTREACH_MAX_CALCULATION_TIME)
+        :type max_time: float
+        """
+        self.max_time = max_time
+        self.queue = []  # (time queued, game type, game object), oldest first
+
+    @wrap_errors(LogicalError)
+    def __len__(self) -> int:
+        return len(self.queue)
+
+    @wrap_errors(LogicalError)
+    def add(self, game_type: str, game) -> None:
+        """
+        Queue a game for its next move
+        :param game_type: type of game, as in the game string (i.e. "Chess")
+        :type game_type: str
+        :param game: game object
+        """
+        self.queue.append((time.time(), game_type, game))
+
+    @wrap_errors(LogicalError)
+    def share(self, entry: tuple, now: float) -> float:
+        """
+        Relative share of the budget a queued anytime game should get
+        """
+        queued, game_type, _ = entry
+        return self.WEIGHTS[game_type] * (1 + self.AGE_WEIGHT * (now - queued))
+
+    @wrap_errors(LogicalError)
+    def run(self, report: callable) -> None:
+        """
+        Makes a move in as many queued games as this cycle's budget allows
+        Games are removed from the queue before they're played, so a game which fails isn't retried forever
+        :param report: called with (game, None) as soon as each game gets its move, (game, exception) if it failed
+        :type report: callable
+        """
+        deadline = time.time() + self.CYCLE_BUDGET
+        for entry in [e for e in self.queue if e[1] not in self.WEIGHTS]:  # Instant games cost nothing, play them all
+            self.queue.remove(entry)
+            self.play(entry[2], None, report)
+        while len(self.queue) > 0 and (remaining := deadline - time.time()) >= self.MIN_SLICE:
+            now = time.time()
+            share = self.share(self.queue[0], now) / sum([self.share(e, now) for e in self.queue])
+            self.play(self.queue.pop(0)[2], min(self.max_time, max(self.MIN_SLICE, remaining * share)), report)
+
+    @wrap_errors(LogicalError)
+    def play(self, game, time_limit: float, report: callable) -> None:
+        """
+        Computes and plays the AI's move in a game
+        :param game: game object
+        :param time_limit: time the search may take in seconds, None for instant games
+        :type time_limit: float
+        :param report: see run
+        :type report: callable
+        """
+        try:
+            ai_move = game.get_best_move() if time_limit is None else game.get_best_move(time_limit)
+            game.push(ai_move)
+        except Exception as e:
+            report(game, e)
+        else:
+            report(game, None)
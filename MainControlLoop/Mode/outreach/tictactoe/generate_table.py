@@ -0,0 +1,54 @@
+"""
+Compiles the tic-tac-toe move table in table.py into table.bin, which TicTacToeGame loads at runtime
+Run from the repository root after changing table.py:
+    python -m MainControlLoop.Mode.outreach.tictactoe.generate_table
+
+Format: one byte per board, indexed by the board read as a base 3 number (see board_index)
+0xff if the board isn't in the table, otherwise the best move's cell (row * 3 + column), plus AI_TURN if AI is to move
+Each board in table.py only appears with one player to move, so the turn doesn't need its own index
+"""
+import os
+from lib.exceptions import wrap_errors, LogicalError
+
+TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "table.bin")
+BOARDS = 3 ** 9
+MISSING = 0xff
+AI_TURN = 0x10
+DIGITS = {"-": 0, "x": 1, "o": 2}
+
+
+@wrap_errors(LogicalError)
+def board_index(board_string: str) -> int:
+    """
+    Index of a board in table.bin, the first cell is the least significant digit
+    :param board_string: 9 character board, "x" human, "o" AI, "-" empty
+    :type board_string: str
+    :return: index from 0 to 3 ** 9 - 1
+    :rtype: int
+    """
+    index = 0
+    for piece in reversed(board_string[:9]):
+        index = index * 3 + DIGITS[piece]
+    return index
+
+
+@wrap_errors(LogicalError)
+def compile_table(table: dict) -> bytes:
+    """
+    :param table: board string with turn character -> [row, column] of best move, as returned by table.get_table
+    :type table: dict
+    :return: contents of table.bin
+    :rtype: bytes
+    """
+    packed = bytearray([MISSING]) * BOARDS
+    for game_string, (row, column) in table.items():
+        if packed[index := board_index(game_string)] != MISSING:
+            raise LogicalError(details=f"Board {game_string[:9]} appears with both turns")
+        packed[index] = (AI_TURN if game_string[9] == "a" else 0) | (row * 3 + column)
+    return bytes(packed)
+
+
+if __name__ == "__main__":
+    from MainControlLoop.Mode.outreach.tictactoe.table import get_table
+    with open(TABLE_PATH, "wb") as f:
+        f.write(compile_table(get_table()))
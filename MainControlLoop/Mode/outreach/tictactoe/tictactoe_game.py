@@ -1,11 +1,13 @@
 import numpy as np
 import copy
 import random
-from MainControlLoop.Mode.outreach.tictactoe.table import get_table
+from MainControlLoop.Mode.outreach.tictactoe.generate_table import TABLE_PATH, MISSING, AI_TURN, board_index
 from lib.exceptions import wrap_errors, LogicalError
 
 
 class TicTacToeGame:
+    table = None  # Contents of table.bin, loaded by the first game which needs it, see generate_table
+
     @wrap_errors(LogicalError)
     def __init__(self, sfr, game_id):
         self.sfr = sfr
@@ -65,14 +67,24 @@ class TicTacToeGame:
             self.is_ai_turn = True
         #  always be ai turn
 
+    @classmethod
+    @wrap_errors(LogicalError)
+    def get_table(cls) -> bytes:
+        """
+        Best move table, read from disk once and shared by all games
+        """
+        if cls.table is None:
+            with open(TABLE_PATH, "rb") as f:
+                cls.table = f.read()
+        return cls.table
+
     @wrap_errors(LogicalError)
     def get_best_move(self):
-        table = get_table()
         game_string = str(self).split(';')[1]
-        if game_string in table:  # always should be in table
-            return list(table[game_string])
-        else:  # TODO: figure out what happens
-            raise RuntimeError
+        entry = self.get_table()[board_index(game_string)]
+        if entry == MISSING or bool(entry & AI_TURN) != self.is_ai_turn:  # always should be in table
+            raise RuntimeError  # TODO: figure out what happens
+        return [(entry & 0xf) // 3, (entry & 0xf) % 3]
 
     @wrap_errors(LogicalError)
     def check_winner(self) -> tuple:  # (x_status, o_status) 0 = no winner, 1 = won, (1, 1) if draw
@@ -1,97 +1,234 @@
+import os
 import time
-from math import sqrt
+import multiprocessing
+from math import sqrt, log, inf
 import numpy as np
 import random
-import copy
+from collections import OrderedDict
 from MainControlLoop.Mode.outreach.ultimate_tictactoe.MCTS.node import Node
 from lib.exceptions import wrap_errors, LogicalError
 
 
+def search_worker(args: tuple) -> list:  # Not wrapped, wrap_errors functions can't be pickled to send to workers
+    """
+    Runs an independent search in a worker process of MCTSSearch.get_best_move
+    Exceptions are raised again in get_best_move
+    :param args: (position, calculation time, seed, exploration constant, first play urgency)
+    :return: (move, visits) of each child of the root
+    """
+    state, time_limit, seed, exploration, first_play_urgency = args
+    search = MCTSSearch(None, state, time_limit=time_limit, seed=seed, processes=1,
+                        exploration=exploration, first_play_urgency=first_play_urgency)
+    search.search()
+    return search.root_visits()
+
+
 class MCTSSearch:
+    MAX_VISITS = 20000  # Root visits after which the search stops, if calculation time hasn't run out first
+    MAX_TREES = 8  # Number of games whose search trees are kept for their next move
+    REWARDS = {(0, 1): 1, (1, 1): 0.5, (1, 0): 0}  # Reward of each result for the AI
+    EXPLORATION = sqrt(2)  # Default UCT exploration constant, rewards are between 0 and 1
+    FIRST_PLAY_URGENCY = inf  # Default UCT score of unvisited children, inf tries every child once before any twice
+    trees = OrderedDict()  # game_id -> (position after the AI's move, its subtree), least recently used first
+
+    WORKER_MARGIN = 0.5  # Time workers stop before the calculation time runs out, to send back results, in seconds
+    # Worker processes kept between searches, forking them takes a noticeable part of a move's time on the Pi
+    pool = None
+    pool_size = 0
+
     @wrap_errors(LogicalError)
-    def __init__(self, sfr, initial_state):
+    def __init__(self, sfr, initial_state, game_id=None, exploration: float = EXPLORATION,
+                 first_play_urgency: float = FIRST_PLAY_URGENCY, processes: int = None, time_limit: float = None,
+                 seed: int = None):
+        """
+        :param initial_state: position to search from
+        :type initial_state: :class: 'MainControlLoop.Mode.outreach.ultimate_tictactoe.bitboard.UltimateBitboard'
+        :param game_id: game being played, its search tree is kept for its next move. None to not keep it
+        :param exploration: UCT exploration constant, higher explores more
+        :param first_play_urgency: UCT score of unvisited children, lower values search good moves deeper sooner
+        :param processes: number of independent searches to run in parallel, defaults to number of cores
+        :param time_limit: calculation time in seconds, defaults to OUTREACH_MAX_CALCULATION_TIME
+        :param seed: random seed, for searches which must differ from each other
+        """
         self.sfr = sfr
-        self.root = Node(initial_state, None)
+        self.game_id = game_id
+        self.exploration = exploration
+        self.first_play_urgency = first_play_urgency
+        self.processes = processes or os.cpu_count() or 1
+        self.time_limit = time_limit if time_limit is not None else self.sfr.vars.OUTREACH_MAX_CALCULATION_TIME
+        self.rng = random.Random(seed)
+        self.root_state = initial_state.copy()
+        self.root = self.reuse_tree()
+        self.total_visits = 0  # Root visits of the last get_best_move, summed over all processes
 
         self.start_time = time.time()
 
+    @classmethod
+    @wrap_errors(LogicalError)
+    def get_pool(cls, size: int):
+        """
+        Pool of worker processes, started if needed
+        :param size: number of workers
+        :rtype: :class: 'multiprocessing.pool.Pool'
+        """
+        if cls.pool is None or cls.pool_size != size:
+            cls.shutdown()
+            cls.pool, cls.pool_size = multiprocessing.Pool(size), size
+        return cls.pool
+
+    @classmethod
+    @wrap_errors(LogicalError)
+    def shutdown(cls) -> None:
+        """
+        Stops the worker processes, if they're running
+        """
+        pool, cls.pool, cls.pool_size = cls.pool, None, 0
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+
+    @wrap_errors(LogicalError)
+    def reuse_tree(self) -> Node:
+        """
+        Finds this position in the tree kept from the game's previous move, one human move below the AI's move
+        :return: subtree of this position, or a new root if it wasn't searched before
+        """
+        if self.game_id is None or (entry := MCTSSearch.trees.pop(self.game_id, None)) is None:
+            return Node(None)
+        state, node = entry
+        key = self.root_state.key()
+        for child in node.children or []:
+            state.make(child.move)
+            if state.key() == key:
+                return child
+            state.unmake()
+        return Node(None)
+
+    @wrap_errors(LogicalError)
+    def keep_tree(self, move: int) -> None:
+        """
+        Keeps the subtree of the chosen move for the game's next search, evicting the least recently used tree
+        """
+        if self.game_id is None:
+            return
+        state = self.root_state.copy()
+        state.make(move)
+        MCTSSearch.trees[self.game_id] = (state, next(c for c in self.root.children if c.move == move))
+        while len(MCTSSearch.trees) > self.MAX_TREES:
+            MCTSSearch.trees.popitem(last=False)
+
     @wrap_errors(LogicalError)
     def resources_left(self):
-        if self.root.times_visited > 400:
+        if self.root.times_visited > self.MAX_VISITS:
             return False
-        if time.time() - self.sfr.vars.OUTREACH_MAX_CALCULATION_TIME > self.start_time:
+        if time.time() - self.time_limit > self.start_time:
             return False
         else:
             return True
 
     @wrap_errors(LogicalError)
     def get_best_move(self):
-        while self.resources_left():
-            leaf = self.traverse(self.root)
-            simulation_result = self.rollout(leaf)
-            self.backpropogate(leaf, simulation_result)
-
-        return self.best_child_move(self.root)
+        """
+        Searches until resources run out, in parallel if there's more than one process
+        Root parallel: each process searches its own tree, then visits of the root's children are summed
+        This process searches too, with the tree kept from the game's previous move
+        :return: (int) cell to play, see UltimateBitboard
+        """
+        if len(self.root_state.legal_moves()) == 0:
+            raise LogicalError(details="No legal moves")
+        # Daemonic processes can't start a pool
+        if self.processes <= 1 or multiprocessing.current_process().daemon:
+            self.search()
+            move = self.best_child_move(self.root)
+            self.total_visits = self.root.times_visited
+        else:
+            worker_time = self.time_limit - (time.time() - self.start_time) - self.WORKER_MARGIN
+            try:
+                results = self.get_pool(self.processes - 1).map_async(search_worker, [
+                    (self.root_state, worker_time, self.rng.randrange(2 ** 32), self.exploration,
+                     self.first_play_urgency) for _ in range(self.processes - 1)])
+                self.search()
+                visits = dict(self.root_visits())
+                for worker_visits in results.get():
+                    for child_move, child_visits in worker_visits:
+                        visits[child_move] = visits.get(child_move, 0) + child_visits
+            except Exception:
+                MCTSSearch.shutdown()  # Workers may still be busy with this search, start new ones next time
+                raise
+            move = max(visits, key=visits.get)
+            self.total_visits = sum(visits.values())
+        self.keep_tree(move)
+        return move
 
     @wrap_errors(LogicalError)
-    def traverse(self, node):
-        while not len(node.children) == 0:
-            node = self.best_uct(node)
-
-        if len(node.board_state.get_valid_moves()) == 0:
-            return node
-        else:
-            node.children = [Node(node.board_state.push_move_to_copy(move), node)
-                             for move in node.board_state.get_valid_moves()]
-            return random.choice(node.children)
+    def search(self) -> None:
+        """
+        Runs iterations in this process until resources run out
+        """
+        while self.resources_left():
+            state = self.root_state.copy()
+            edges = self.traverse(state)
+            simulation_result = state.random_playout(self.rng)
+            self.backpropogate(edges, simulation_result)
 
     @wrap_errors(LogicalError)
-    def rollout(self, node):
-        board_state = copy.deepcopy(node.board_state)
-        while True:
-            legal_moves = board_state.get_valid_moves()
-            if len(legal_moves) == 0:
-                break
-            board_state.push(random.choice(legal_moves))
-
-        outcomes = {
-            (0, 1): 2,
-            (1, 1): 1,
-            (1, 0): 0,
-        }
-        return outcomes[board_state.check_winner()]
+    def root_visits(self) -> list:
+        """
+        :return: (move, visits) of each child of the root
+        """
+        if not self.root.children:
+            return []
+        return [(child.move, int(visits)) for child, visits in zip(self.root.children, self.root.child_visits)]
 
     @wrap_errors(LogicalError)
-    def backpropogate(self, leaf, simulation_result):
-        node = leaf
-        while node is not None:
-            node.value += simulation_result
-            node.times_visited += 1
-            node = node.parent
+    def traverse(self, state):
+        """
+        Descends from the root, playing each chosen move on state, and expands the leaf reached
+        :param state: copy of the root position, left at the position of the leaf
+        :return: (list) (parent, index of child) of each edge from the root to the leaf
+        """
+        node = self.root
+        edges = []
+        while node.children is not None and len(node.children) > 0:
+            edges.append((node, index := self.best_uct(node)))
+            node = node.children[index]
+            state.make(node.move)
+
+        if node.children is not None or len(legal_moves := state.legal_moves()) == 0:
+            node.children = []  # Game over
+            return edges
+        node.expand(legal_moves)
+        edges.append((node, index := self.rng.randrange(len(legal_moves))))
+        state.make(node.children[index].move)
+        return edges
 
     @wrap_errors(LogicalError)
-    def best_uct(self, node):
-        def _uct(child_node):
-            return (child_node.value/child_node.times_visited) \
-                   + (sqrt(2)*sqrt(np.log(node.times_visited)/child_node.times_visited))
+    def backpropogate(self, edges, simulation_result):
+        """
+        Adds the result to every edge from the root, as the reward of the player who played each edge's move
+        """
+        reward = self.REWARDS[simulation_result]
+        ai_moved = self.root_state.ai_turn  # Player who plays the root's children
+        self.root.times_visited += 1
+        for parent, index in edges:
+            parent.child_values[index] += reward if ai_moved else 1 - reward
+            parent.child_visits[index] += 1
+            parent.children[index].times_visited += 1
+            ai_moved = not ai_moved
 
-        children_list = list(map(_uct, node.children))
-        return node.children[children_list.index(max(children_list))]
+    @wrap_errors(LogicalError)
+    def best_uct(self, node) -> int:
+        """
+        :return: index of the child with the highest UCT score
+        """
+        visits = node.child_visits
+        visited = visits > 0
+        scores = np.full(len(visits), self.first_play_urgency)
+        # value / visits + c * sqrt(log(N) / visits), with a single division
+        np.divide(node.child_values + self.exploration * np.sqrt(log(node.times_visited) * visits),
+                  visits, out=scores, where=visited)
+        return int(np.argmax(scores))
 
     @wrap_errors(LogicalError)
     def best_child_move(self, node):
-        def _get_visits(child_node):
-            return child_node.times_visited
-
-        children_list = list(map(_get_visits, node.children))
-        max_index = children_list.index(max(children_list))
-        legal_moves = node.board_state.get_valid_moves()
-        return legal_moves[max_index]
-
-
-
-
-
-
-
-
+        return node.children[int(np.argmax(node.child_visits))].move
@@ -1,12 +1,28 @@
+import numpy as np
 from lib.exceptions import wrap_errors, LogicalError
 
 
 class Node:
+    """
+    Search tree node, holds only the move leading to it, positions are replayed from the root while descending
+    Statistics of children are kept in arrays on their parent, so all of their UCT scores are one numpy expression
+    """
+    __slots__ = ["move", "children", "times_visited", "child_visits", "child_values"]
+
     @wrap_errors(LogicalError)
-    def __init__(self, board_state, parent):
-        self.board_state = board_state
-        self.parent = parent
-        self.children = []
+    def __init__(self, move):
+        self.move = move  # Cell played to reach this node, None for the root
+        self.children = None  # None until expanded, empty if the game is over
+
+        self.times_visited = 0
+        self.child_visits = None  # Visits of each child
+        self.child_values = None  # Total reward of each child, for the player who played its move
 
-        self.times_visited = 1
-        self.value = 1
+    @wrap_errors(LogicalError)
+    def expand(self, moves: list) -> None:
+        """
+        Adds a child for each legal move
+        """
+        self.children = [Node(move) for move in moves]
+        self.child_visits = np.zeros(len(moves))
+        self.child_values = np.zeros(len(moves))
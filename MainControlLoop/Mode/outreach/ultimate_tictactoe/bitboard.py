@@ -0,0 +1,198 @@
+import random
+from lib.exceptions import wrap_errors, LogicalError
+
+# Every 3x3 grid is a 9 bit mask, bit r * 3 + c set for row r, column c
+LINES = (0x1C0, 0x38, 0x7, 0x124, 0x92, 0x49, 0x111, 0x54)  # Winning lines of a 3x3 grid
+FULL = 0x1FF
+WINS = tuple([any([mask & line == line for line in LINES]) for mask in range(FULL + 1)])  # Mask -> holds a line
+CELLS = tuple([tuple([i for i in range(9) if mask >> i & 1]) for mask in range(FULL + 1)])  # Mask -> set bits
+
+
+class UltimateBitboard:
+    """
+    Compact Ultimate Tic-Tac-Toe position for search
+    Cell b * 9 + r * 3 + c is row r, column c of sub board b, so a move is a single int from 0 to 80
+    Each player's pieces are one 81 bit int, and won and decided (won or full) sub boards are 9 bit masks
+    Copying is a handful of int assignments, and make can be undone with unmake
+    """
+    __slots__ = ["x", "o", "x_won", "o_won", "decided", "last", "ai_turn", "history"]
+
+    @wrap_errors(LogicalError)
+    def __init__(self):
+        self.x = 0  # Human pieces
+        self.o = 0  # AI pieces
+        self.x_won = 0  # Sub boards won by human
+        self.o_won = 0  # Sub boards won by AI
+        self.decided = 0  # Sub boards which are won or full
+        self.last = -1  # Previous move, -1 if none
+        self.ai_turn = True
+        self.history = []  # State before each make, for unmake
+
+    @staticmethod
+    @wrap_errors(LogicalError)
+    def to_location(cell: int) -> list:
+        """
+        Converts a cell to the [sub board, row, column] moves used by UltimateTicTacToeGame
+        """
+        return [cell // 9, cell % 9 // 3, cell % 3]
+
+    @staticmethod
+    @wrap_errors(LogicalError)
+    def from_location(location: list) -> int:
+        """
+        Converts a [sub board, row, column] move to a cell
+        """
+        return int(location[0]) * 9 + int(location[1]) * 3 + int(location[2])
+
+    @classmethod
+    @wrap_errors(LogicalError)
+    def from_string(cls, board_string: str):
+        """
+        Builds a position from the board string of UltimateTicTacToeGame.set_game
+        :param board_string: nine 3x3 boards, previous move and turn, comma separated
+        :return: position
+        :rtype: UltimateBitboard
+        """
+        encoded_list = board_string.split(",")
+        board = cls()
+        for b, encoded in enumerate(encoded_list[:9]):
+            for i, piece in enumerate(encoded):
+                if piece == "x":
+                    board.x |= 1 << (b * 9 + i)
+                elif piece == "o":
+                    board.o |= 1 << (b * 9 + i)
+            board.update_sub_board(b)
+        previous_move = list(map(int, encoded_list[9:12]))
+        board.last = -1 if previous_move[0] == -1 else cls.from_location(previous_move)
+        board.ai_turn = encoded_list[12] == "a"
+        return board
+
+    @wrap_errors(LogicalError)
+    def to_string(self) -> str:
+        """
+        Board string in the format read by from_string
+        """
+        boards = []
+        for b in range(9):
+            x, o = self.x >> (b * 9), self.o >> (b * 9)
+            boards.append("".join(["x" if x >> i & 1 else "o" if o >> i & 1 else "-" for i in range(9)]))
+        previous_move = [-1, -1, -1] if self.last == -1 else self.to_location(self.last)
+        return ",".join(boards + [str(i) for i in previous_move] + ["a" if self.ai_turn else "h"])
+
+    @wrap_errors(LogicalError)
+    def copy(self):
+        """
+        Copy of the position, without undo history
+        :rtype: UltimateBitboard
+        """
+        board = UltimateBitboard.__new__(UltimateBitboard)
+        board.x, board.o, board.x_won, board.o_won = self.x, self.o, self.x_won, self.o_won
+        board.decided, board.last, board.ai_turn = self.decided, self.last, self.ai_turn
+        board.history = []
+        return board
+
+    @wrap_errors(LogicalError)
+    def key(self) -> tuple:
+        """
+        Identifies the position, equal for equal positions regardless of how they were reached
+        """
+        return self.x, self.o, self.last, self.ai_turn
+
+    @wrap_errors(LogicalError)
+    def update_sub_board(self, b: int) -> None:
+        """
+        Recomputes whether a sub board is won or full
+        """
+        shift = b * 9
+        if WINS[self.x >> shift & FULL]:
+            self.x_won |= 1 << b
+        elif WINS[self.o >> shift & FULL]:
+            self.o_won |= 1 << b
+        elif (self.x | self.o) >> shift & FULL != FULL:
+            return
+        self.decided |= 1 << b
+
+    @wrap_errors(LogicalError)
+    def forced_board(self) -> int:
+        """
+        Sub board the player to move has to play in, -1 if they can play in any undecided sub board
+        """
+        if self.last == -1 or self.decided >> (target := self.last % 9) & 1:
+            return -1
+        return target
+
+    @wrap_errors(LogicalError)
+    def legal_moves(self) -> list:
+        """
+        :return: cells the player to move can play, empty if the game is over
+        :rtype: list
+        """
+        if WINS[self.x_won] or WINS[self.o_won]:
+            return []
+        occupied = self.x | self.o
+        target = self.forced_board()
+        moves = []
+        for b in (CELLS[FULL & ~self.decided] if target == -1 else (target,)):
+            shift = b * 9
+            moves.extend([shift + i for i in CELLS[~(occupied >> shift) & FULL]])
+        return moves
+
+    @wrap_errors(LogicalError)
+    def make(self, cell: int) -> None:
+        """
+        Plays a move for the player to move, undone by unmake
+        :param cell: legal move
+        :type cell: int
+        """
+        self.history.append((cell, self.last, self.x_won, self.o_won, self.decided))
+        if self.ai_turn:
+            self.o |= 1 << cell
+        else:
+            self.x |= 1 << cell
+        self.update_sub_board(cell // 9)
+        self.last = cell
+        self.ai_turn = not self.ai_turn
+
+    @wrap_errors(LogicalError)
+    def unmake(self) -> None:
+        """
+        Takes back the last move played with make
+        """
+        cell, self.last, self.x_won, self.o_won, self.decided = self.history.pop()
+        self.x &= ~(1 << cell)
+        self.o &= ~(1 << cell)
+        self.ai_turn = not self.ai_turn
+
+    @wrap_errors(LogicalError)
+    def winner(self) -> tuple:
+        """
+        Result of the game, in the format of UltimateTicTacToeGame.check_winner
+        :return: (1, 0) if human won, (0, 1) if AI won, (1, 1) if drawn, (0, 0) if not over
+        :rtype: tuple
+        """
+        if WINS[self.x_won]:
+            return 1, 0
+        if WINS[self.o_won]:
+            return 0, 1
+        if self.decided == FULL:
+            return 1, 1
+        return 0, 0
+
+    @wrap_errors(LogicalError)
+    def random_playout(self, rng: random.Random = random) -> tuple:
+        """
+        Plays random moves until the game is over, modifies the position without recording history
+        :param rng: source of randomness
+        :return: result of the game, see winner
+        :rtype: tuple
+        """
+        while len(moves := self.legal_moves()) > 0:
+            cell = rng.choice(moves)
+            if self.ai_turn:
+                self.o |= 1 << cell
+            else:
+                self.x |= 1 << cell
+            self.update_sub_board(cell // 9)
+            self.last = cell
+            self.ai_turn = not self.ai_turn
+        return self.winner()
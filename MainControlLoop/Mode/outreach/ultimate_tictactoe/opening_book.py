@@ -0,0 +1,154 @@
+import os
+from collections import OrderedDict
+from lib.log import PKLLog
+from lib.exceptions import wrap_errors, LogicalError
+
+
+@wrap_errors(LogicalError)
+def grid_symmetries() -> list:
+    """
+    The 8 rotations and reflections of a 3x3 grid
+    :return: for each symmetry, the new index of each of the 9 cells
+    :rtype: list
+    """
+    symmetries = []
+    for rotations in range(4):
+        for flip in (False, True):
+            permutation = []
+            for i in range(9):
+                r, c = i // 3, i % 3
+                for _ in range(rotations):
+                    r, c = c, 2 - r
+                if flip:
+                    c = 2 - c
+                permutation.append(r * 3 + c)
+            symmetries.append(tuple(permutation))
+    return symmetries
+
+
+GRID_SYMMETRIES = grid_symmetries()
+# Symmetries of the whole board: sub boards move around the big grid and cells move the same way within them
+CELL_SYMMETRIES = [tuple([s[cell // 9] * 9 + s[cell % 9] for cell in range(81)]) for s in GRID_SYMMETRIES]
+INVERSE_SYMMETRIES = [tuple(sorted(range(81), key=s.__getitem__)) for s in CELL_SYMMETRIES]
+
+
+class OpeningBook:
+    """
+    Best moves of Ultimate Tic-Tac-Toe positions searched before, kept between games and reboots
+    Openings repeat a lot between players, so these are answered without searching
+    Positions are stored under a canonical key, the smallest among the board's 8 symmetries, so mirrored and rotated
+    positions share an entry. The least recently used entry is evicted once the book is full
+    Saved every SAVE_EVERY stores and on shutdown rather than after every search, since the book is written whole.
+    The entries are saved in recency order, so eviction continues where it left off after a restart
+    """
+    PATH = "./lib/data/ultimate_book.pkl"
+    MAX_ENTRIES = 5000
+    MIN_VISITS = 2000  # Root visits a search needs for its move to be trusted by the book
+    SAVE_EVERY = 25  # Stores between saves
+    shared = None  # Book used by every game, see get
+
+    @wrap_errors(LogicalError)
+    def __init__(self, path: str = PATH):
+        self.log = PKLLog(path)
+        self.entries = OrderedDict()  # Canonical key -> (canonical move, root visits), least recently used first
+        self.unsaved = 0  # Stores since the last save
+        self.changed = False  # Whether entries or their order changed since the last save
+        if os.path.exists(path):  # PKLLog.clear deletes the file, so there's no book until the first store
+            self.entries = self.log.read()
+
+    @classmethod
+    @wrap_errors(LogicalError)
+    def get(cls):
+        """
+        Book shared by every game, loaded from disk the first time it's needed
+        :rtype: OpeningBook
+        """
+        if cls.shared is None:
+            cls.shared = cls()
+        return cls.shared
+
+    @classmethod
+    @wrap_errors(LogicalError)
+    def shutdown(cls) -> None:
+        """
+        Saves the shared book, if it was loaded, and unloads it
+        """
+        book, cls.shared = cls.shared, None
+        if book is not None:
+            book.save()
+
+    @wrap_errors(LogicalError)
+    def save(self) -> None:
+        """
+        Writes the book to disk, if anything changed
+        """
+        if self.changed:
+            self.log.write(self.entries)
+        self.unsaved, self.changed = 0, False
+
+    @staticmethod
+    @wrap_errors(LogicalError)
+    def transform(mask: int, permutation: tuple) -> int:
+        """
+        Moves every set bit of an 81 bit mask to its new cell
+        """
+        result = 0
+        while mask:
+            low = mask & -mask
+            result |= 1 << permutation[low.bit_length() - 1]
+            mask ^= low
+        return result
+
+    @wrap_errors(LogicalError)
+    def canonical(self, board) -> tuple:
+        """
+        Canonical key of a position and the symmetry which produces it
+        The forced sub board is used instead of the previous move, since that's all the previous move affects
+        :param board: position
+        :type board: :class: 'MainControlLoop.Mode.outreach.ultimate_tictactoe.bitboard.UltimateBitboard'
+        :return: (key, index of symmetry)
+        :rtype: tuple
+        """
+        forced = board.forced_board()
+        keys = [(self.transform(board.x, CELL_SYMMETRIES[s]), self.transform(board.o, CELL_SYMMETRIES[s]),
+                 -1 if forced == -1 else GRID_SYMMETRIES[s][forced], board.ai_turn) for s in range(8)]
+        key = min(keys)
+        return key, keys.index(key)
+
+    @wrap_errors(LogicalError)
+    def lookup(self, board):
+        """
+        :param board: position
+        :type board: :class: 'MainControlLoop.Mode.outreach.ultimate_tictactoe.bitboard.UltimateBitboard'
+        :return: (int) best move stored for the position, None if there isn't one
+        """
+        key, s = self.canonical(board)
+        if (entry := self.entries.get(key)) is None:
+            return None
+        self.entries.move_to_end(key)
+        self.changed = True
+        move = INVERSE_SYMMETRIES[s][entry[0]]
+        return move if move in board.legal_moves() else None
+
+    @wrap_errors(LogicalError)
+    def store(self, board, move: int, visits: int) -> None:
+        """
+        Stores the result of a search, if it's trusted and better searched than what's stored already
+        :param board: position searched
+        :type board: :class: 'MainControlLoop.Mode.outreach.ultimate_tictactoe.bitboard.UltimateBitboard'
+        :param move: move chosen
+        :param visits: root visits of the search
+        """
+        if visits < self.MIN_VISITS:
+            return
+        key, s = self.canonical(board)
+        if (entry := self.entries.get(key)) is not None and entry[1] >= visits:
+            return
+        self.entries[key] = (CELL_SYMMETRIES[s][move], visits)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.MAX_ENTRIES:
+            self.entries.popitem(last=False)
+        self.changed = True
+        self.unsaved += 1
+        if self.unsaved >= self.SAVE_EVERY:
+            self.save()
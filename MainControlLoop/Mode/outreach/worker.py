@@ -0,0 +1,180 @@
+import sys
+import time
+import queue
+import atexit
+import signal
+import multiprocessing
+from MainControlLoop.Mode.outreach.chess.chess_game import ChessGame
+from MainControlLoop.Mode.outreach.chess.engine import ChessEngine
+from MainControlLoop.Mode.outreach.tictactoe.tictactoe_game import TicTacToeGame
+from MainControlLoop.Mode.outreach.ultimate_tictactoe.ultimate_game import UltimateTicTacToeGame
+from MainControlLoop.Mode.outreach.ultimate_tictactoe.MCTS.mcts_search import MCTSSearch
+from MainControlLoop.Mode.outreach.ultimate_tictactoe.opening_book import OpeningBook
+from MainControlLoop.Mode.outreach.jokes.jokes_game import JokesGame
+from MainControlLoop.Mode.outreach.scheduler import GameScheduler
+from lib.exceptions import wrap_errors, LogicalError
+
+GAMES = {  # Game type in game strings -> class
+    "TicTacToe": TicTacToeGame,
+    "Chess": ChessGame,
+    "Ultimate": UltimateTicTacToeGame,
+    "Jokes": JokesGame,
+}
+
+
+def worker_loop(requests, responses, max_time: float) -> None:  # Not wrapped, runs in its own process
+    """
+    Main function of the worker process: plays every game string received on requests, answers on responses
+    Waits for requests only when no game is queued, otherwise picks up new ones between scheduler cycles
+    Exits by itself if the flight software died without stopping it
+    Games have no sfr here, the scheduler always gives anytime games a time limit
+    :param requests: queue of game strings (game;board_string;game_id), None to stop
+    :param responses: queue of (game_id, updated game string, None) or (game_id, None, error)
+    :param max_time: OUTREACH_MAX_CALCULATION_TIME
+    """
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit())  # Clean up below when killed by stop
+    scheduler = GameScheduler(max_time)
+
+    def report(game, error):
+        if error is None:
+            responses.put((game.game_id, str(game), None))
+        else:  # repr, exceptions aren't always picklable
+            responses.put((game.game_id, None, repr(error)))
+
+    try:
+        while True:
+            idle = len(scheduler) == 0
+            try:
+                encoded_string = requests.get(block=idle, timeout=OutreachWorker.PARENT_CHECK if idle else None)
+            except queue.Empty:
+                if not idle:
+                    scheduler.run(report)
+                elif not multiprocessing.parent_process().is_alive():
+                    return
+                continue
+            if encoded_string is None:
+                return
+            game_type, board_string, game_id = encoded_string.split(";")
+            try:
+                game = GAMES[game_type](None, game_id)
+                game.set_game(board_string)
+            except Exception as e:
+                responses.put((game_id, None, repr(e)))
+                continue
+            scheduler.add(game_type, game)
+    finally:
+        ChessEngine.shutdown()
+        MCTSSearch.shutdown()
+        OpeningBook.shutdown()
+
+
+class OutreachWorker:
+    """
+    Solves outreach games in a separate process, so the main control loop keeps its cycle time
+    (resetting the EPS watchdog, reading radios, logging) however long games take to solve
+    Game strings are submitted and results collected without blocking, both keyed by game_id
+    The process, with its chess engine, search trees and opening book, lives until stop, and is restarted if it dies
+    It isn't daemonic, so its MCTS searches can use a pool of their own. Python waits for non-daemonic processes
+    before exiting, so stop is also registered to run at exit
+    It's spawned rather than forked, so it doesn't inherit the flight software's threads, locks and open serial
+    or I2C handles, only importing the game code
+    """
+    CONTEXT = multiprocessing.get_context("spawn")
+    JOIN_TIMEOUT = 5  # Time the worker has to exit before it's killed, in seconds
+    PARENT_CHECK = 5  # Time between checks that the flight software is still running while idle, in seconds
+    FINISH_INTERVAL = 0.1  # Time between checks for answers in finish, in seconds
+
+    @wrap_errors(LogicalError)
+    def __init__(self, sfr):
+        """
+        :param sfr: sfr object
+        :type sfr: :class: 'lib.registry.StateFieldRegistry'
+        """
+        self.sfr = sfr
+        self.requests = None
+        self.responses = None
+        self.process = None  # Started on the first submit
+        self.pending = {}  # game_id -> game string, submitted but not answered yet
+
+    @wrap_errors(LogicalError)
+    def start(self) -> None:
+        """
+        Starts the worker process, and resubmits games a dead worker didn't answer
+        """
+        self.requests = self.CONTEXT.Queue()
+        self.responses = self.CONTEXT.Queue()
+        self.process = self.CONTEXT.Process(target=worker_loop, name="Outreach worker", daemon=False, args=(
+            self.requests, self.responses, self.sfr.vars.OUTREACH_MAX_CALCULATION_TIME))
+        self.process.start()
+        atexit.register(self.stop)
+        for encoded_string in self.pending.values():
+            self.requests.put(encoded_string)
+
+    @wrap_errors(LogicalError)
+    def submit(self, encoded_string: str) -> None:
+        """
+        Queues a game for its next move
+        :param encoded_string: game;board_string;game_id
+        :type encoded_string: str
+        """
+        self.pending[encoded_string.split(";")[2]] = encoded_string
+        if self.process is None or not self.process.is_alive():
+            self.start()  # Also sends encoded_string, it's already pending
+        else:
+            self.requests.put(encoded_string)
+
+    @wrap_errors(LogicalError)
+    def results(self) -> list:
+        """
+        Collects games the worker finished since last call, without waiting for any
+        :return: (game_id, updated game string, None) or (game_id, None, error string) of each game
+        :rtype: list
+        """
+        if self.process is None:
+            return []
+        finished = []
+        while True:
+            try:
+                game_id, game_string, error = self.responses.get_nowait()
+            except queue.Empty:
+                break
+            self.pending.pop(game_id, None)
+            finished.append((game_id, game_string, error))
+        if not self.process.is_alive() and len(self.pending) > 0:
+            self.start()
+        return finished
+
+    @wrap_errors(LogicalError)
+    def finish(self, timeout: float) -> list:
+        """
+        Waits for the worker to answer every pending game
+        :param timeout: longest time to wait, in seconds
+        :type timeout: float
+        :return: finished games, see results
+        :rtype: list
+        """
+        finished = self.results()
+        deadline = time.time() + timeout
+        while len(self.pending) > 0 and time.time() < deadline:
+            time.sleep(self.FINISH_INTERVAL)
+            finished += self.results()
+        return finished
+
+    @wrap_errors(LogicalError)
+    def stop(self) -> list:
+        """
+        Stops the worker
+        :return: game strings it hasn't answered, to submit again later
+        :rtype: list
+        """
+        unanswered, self.pending = list(self.pending.values()), {}
+        if self.process is None:
+            return unanswered
+        atexit.unregister(self.stop)
+        self.requests.put(None)
+        self.process.join(self.JOIN_TIMEOUT)
+        if self.process.is_alive():
+            self.process.terminate()  # Worker still cleans up, see worker_loop
+            self.process.join()
+        self.process = None
+        return unanswered
@@ -6,7 +6,10 @@ from Drivers.transmission_packet import TransmissionPacket, FullPacket
 from Drivers.aprs import APRS
 from Drivers.iridium import Iridium
 from lib.exceptions import wrap_errors, LogicalError, CommandExecutionException, NoSignalException, IridiumError
-from MainControlLoop.Mode.outreach.jokes.jokes_game import JokesGame
+from lib import timeseries_codec, opcodes
+from lib.response_cache import ResponseCache
+from lib.size_model import FixedSize, PerArgSize, EstimatedSize
+from MainControlLoop.Mode.outreach.jokes.joke_corpus import JokeCorpus
 
 class CommandExecutor:
     @wrap_errors(LogicalError)
@@ -14,6 +17,18 @@ class CommandExecutor:
         self.sfr = sfr
         self.TJ_PREFIX = "TJ;"
         self.OUTREACH_PREFIX = "OUT;"
+        # Log dump formats, selected by second argument of ASV and ATB
+        self.LEGACY_FORMAT = 0  # Every value as a float, including both halves of the timestamp
+        self.COMPACT_FORMAT = 1  # lib.timeseries_codec
+        self.COMPRESSED_FORMAT = 2  # lib.timeseries_codec with zlib
+        self.response_cache = ResponseCache(sfr)  # Results of read-only queries, see execute
+        # Responses collected during execute_buffers, transmitted together at the end. None when not collecting
+        # (packet, add_to_queue, measurement of the command which sent it)
+        self.deferred = None
+        # Command log rows of commands run during execute_buffers, written once their responses are transmitted
+        # so they include the cost of transmitting. (row, measurement)
+        self.deferred_logs = []
+        JokeCorpus.load_all()  # Read jokes now, so heartbeats don't touch the filesystem
 
         self.primary_registry = {  # primary command registry for BOTH Iridium and APRS
             "MCH": self.MCH,
@@ -61,8 +76,12 @@ class CommandExecutor:
             "ICT": self.ICT,
             "ICE": self.ICE,
             "IAK": self.IAK,
-            "ZMV": self.ZMV
+            "ZMV": self.ZMV,
+            "APF": self.APF,
         }
+        # Every command needs an opcode to be sent over Iridium, see lib.opcodes
+        if set(self.primary_registry.keys()) != set(opcodes.DESCRIPTORS[1:]):
+            raise LogicalError(details="Primary registry doesn't match opcode table")
 
         # TODO: IMPLEMENT FULLY: Currently based off of Alan's guess of what we need
         self.secondary_registry = {  # Secondary command registry for APRS, in outreach mode
@@ -79,6 +98,57 @@ class CommandExecutor:
             "ITM": self.ITM
         }
 
+        # Response size of each command, used by ARS to project sizes without running commands
+        # ICE has no model, its response is arbitrary
+        self.size_models = {
+            "MCH": FixedSize(1),
+            "MSC": FixedSize(1),
+            "MOU": FixedSize(1),
+            "MLK": FixedSize(0),
+            "MDF": FixedSize(0),
+            "DLN": FixedSize(1),
+            "DLF": FixedSize(1),
+            "DDF": FixedSize(1),
+            "GCM": EstimatedSize(lambda args: (len(str(self.sfr.MODE)), False)),
+            "GCR": FixedSize(2),
+            "GVT": FixedSize(1),
+            "GPL": FixedSize(4),
+            "GCD": FixedSize(13),
+            "GPW": FixedSize(1),
+            "GPR": FixedSize(1),
+            "GOP": FixedSize(1),
+            "GCS": EstimatedSize(lambda args: (len(self.sfr.vars.to_dict()), True)),
+            "GID": FixedSize(2),
+            "GSM": FixedSize(1),
+            "GSV": FixedSize(1),
+            "GSG": FixedSize(1),
+            "GTB": FixedSize(6),
+            "GMT": FixedSize(1),
+            "GTS": FixedSize(2),
+            "AAP": FixedSize(1),
+            "APW": PerArgSize(1),  # At most one total per row
+            "ASV": EstimatedSize(lambda args: self.log_dump_size(args, 4)),
+            "ASG": PerArgSize(1),  # At most one total per row, only rows in sunlight are sent
+            "ATB": EstimatedSize(lambda args: self.log_dump_size(args, 3)),
+            "ARS": FixedSize(2),
+            "AMS": EstimatedSize(self.replay_size),
+            "SUV": FixedSize(1),
+            "SLV": FixedSize(1),
+            "SDT": FixedSize(1),
+            "SSF": FixedSize(0),
+            "SFA": FixedSize(1),
+            "SFR": FixedSize(1),
+            "USM": FixedSize(13),
+            "ITM": FixedSize(0),
+            "IHB": FixedSize(250, numerical=False),  # Summary and joke of the day, jokes vary in length
+            "IPC": FixedSize(0),
+            "IRB": FixedSize(0),
+            "ICT": FixedSize(0),
+            "IAK": FixedSize(0),
+            "ZMV": FixedSize(0),
+            "APF": FixedSize(len(self.sfr.metrics.summary(""))),
+        }
+
     @wrap_errors(LogicalError)
     def execute(self, packet: TransmissionPacket, registry: dict):
         """
@@ -101,65 +171,161 @@ class CommandExecutor:
         if packet.descriptor == "GRB":  # Handle garbled iridium messages
             self.transmit(packet, packet.args, string=True)
             return
+        self.sfr.metrics.start()
         try:
-            result = registry[packet.descriptor](packet)  # EXECUTES THE COMMAND
+            if (result := self.response_cache.get(packet)) is not None:  # Repeated query, don't recompute
+                self.transmit(packet, result)
+            else:
+                if not self.response_cache.cacheable(packet):  # Anything else may change state
+                    self.response_cache.invalidate()
+                result = registry[packet.descriptor](packet)  # EXECUTES THE COMMAND
+                self.response_cache.put(packet, result)
             to_log["result"] = ":".join([str(s) for s in result])
         except CommandExecutionException as e:
             self.transmit(packet, [repr(e)], True)
             to_log["result"] = "ERR:" + (type(e.exception).__name__ if e.exception is not None else repr(e.details))
         finally:
-            self.sfr.logs["command"].write(to_log)
+            metrics = self.sfr.metrics.stop(packet.descriptor)
+            if self.deferred is not None:
+                self.deferred_logs.append((to_log, metrics))
+            else:
+                self.log_command(to_log, metrics)
             self.sfr.vars.LAST_COMMAND_RUN = time.time()
 
+    @wrap_errors(LogicalError)
+    def log_command(self, row: dict, metrics: dict) -> None:
+        """
+        Write a command log row with the command's measurement
+        :param row: row without measurement columns
+        :param metrics: measurement from sfr.metrics
+        """
+        row.update({field: metrics[field] for field in ["wall", "io", "bytes", "energy"]})
+        self.sfr.logs["command"].write(row)
+
     @wrap_errors(LogicalError)
     def execute_buffers(self):
         """
         Iterate through command and outreach buffers and execute all commands
+        Responses are collected and transmitted together once every command has run, see flush_deferred
+        """
+        if self.sfr.devices["APRS"] is not None:
+            self.sfr.devices["APRS"].next_msg()  # Collect packets parsed by the APRS reader thread
+        self.deferred = []
+        try:
+            # iterates through all commands in the buffer, then after executing all, empties buffer
+            for command_packet in self.sfr.vars.command_buffer:
+                self.execute(command_packet, self.primary_registry)
+            self.sfr.vars.command_buffer = []
+
+            for command_packet in self.sfr.vars.outreach_buffer:
+                self.execute(command_packet, self.secondary_registry)
+            self.sfr.vars.outreach_buffer = []
+        finally:
+            self.flush_deferred()
+
+    @wrap_errors(LogicalError)
+    def flush_deferred(self) -> bool:
+        """
+        Transmit every response collected during execute_buffers, then log the commands which sent them
+        Fragments of all responses are packed into as few transmissions as the primary radio allows (see batch_length)
+        Fragments which can't be sent are queued, unless their response was transmitted with add_to_queue=False
+        Each transmission's cost is shared between the commands whose fragments it carried, by fragment size
+        :return: (bool) whether everything was transmitted
         """
-        # iterates through all commands in the buffer, then after executing all, empties buffer
-        for command_packet in self.sfr.vars.command_buffer:
-            self.execute(command_packet, self.primary_registry)
-        self.sfr.vars.command_buffer = []
+        deferred, self.deferred = self.deferred, None
+        try:
+            if deferred is None or len(deferred) == 0:
+                return True
+            radio = self.sfr.devices[self.sfr.vars.PRIMARY_RADIO]
+            fragments = []  # (packet, whether it may be queued, measurement of its command)
+            for packet, add_to_queue, measurement in deferred:
+                fragments += [(p, add_to_queue, measurement)
+                              for p in (Iridium if radio is None else radio).split_packet(packet)]
+            for _, _, measurement in fragments:
+                if measurement is not None:
+                    measurement["fragments"] += 1
+            while len(fragments) > 0:
+                if radio is None:  # If primary radio is off, append to queue
+                    sent = False
+                else:
+                    batch = fragments[:self.batch_length([p for p, _, _ in fragments])]
+                    self.sfr.metrics.start()
+                    try:
+                        sent = self.transmit_from_buffer([p for p, _, _ in batch])
+                    except Exception:  # Queue remaining fragments before raising to handle in mission_control
+                        self.queue_fragments(fragments)
+                        raise
+                    finally:
+                        cost = self.sfr.metrics.stop()
+                        shared = [(m, len(str(p))) for p, _, m in batch if m is not None]
+                        self.sfr.metrics.share(cost, [m for m, _ in shared], [w for _, w in shared])
+                if not sent:
+                    self.queue_fragments(fragments)
+                    return False
+                del fragments[:len(batch)]
+            return True
+        finally:
+            deferred_logs, self.deferred_logs = self.deferred_logs, []
+            for row, metrics in deferred_logs:
+                self.log_command(row, metrics)
 
-        for command_packet in self.sfr.vars.outreach_buffer:
-            self.execute(command_packet, self.secondary_registry)
-        self.sfr.vars.outreach_buffer = []
+    @wrap_errors(LogicalError)
+    def queue_fragments(self, fragments: list) -> None:
+        """
+        Queue fragments flush_deferred couldn't transmit, and count them against their commands
+        :param fragments: (packet, whether it may be queued, measurement of its command)
+        """
+        for packet, add_to_queue, measurement in fragments:
+            if add_to_queue:
+                self.sfr.vars.transmit_buffer.append(packet)
+                if measurement is not None:
+                    measurement["queued"] += 1
 
     @wrap_errors(LogicalError)
     def transmit(self, packet: TransmissionPacket, data: list = None,
-                 string: bool = False, add_to_queue: bool = True):
+                 string: bool = False, add_to_queue: bool = True, urgent: bool = False):
         """
         Transmit a message over primary radio
+        While execute_buffers is running, the message is collected and transmitted with every other response
         :param packet: (TransmissionPacket) packet of received transmission
         :param data: (list) of data, or a single length list of error message
         :param string: (bool) whether transmission is a string message
         :param add_to_queue: (bool) whether to append message to queue
-        :return: (bool) transmission successful
+        :param urgent: (bool) transmit now even while execute_buffers is running
+        :return: (bool) transmission successful, True if deferred
         """
         if string:
             packet.numerical = False
         if data is not None:
             packet.return_data = data
+        if self.deferred is not None and not urgent:
+            self.deferred.append((packet, add_to_queue, self.sfr.metrics.current))
+            return True
         # Otherwise, split the packet and transmit components
         if self.sfr.devices[
             self.sfr.vars.PRIMARY_RADIO] is None and add_to_queue:  # If primary radio is off, append to queue
-            self.sfr.vars.transmit_buffer += Iridium.split_packet(packet)  # Split packet and extend
+            self.sfr.vars.transmit_buffer.extend(packets := Iridium.split_packet(packet))  # Split packet and extend
+            self.sfr.metrics.add_fragments(len(packets), len(packets))
             return False
         packets = self.sfr.devices[self.sfr.vars.PRIMARY_RADIO].split_packet(packet)
+        fragments = len(packets)
         while len(packets) > 0:
             try:
                 self.sfr.devices[self.sfr.vars.PRIMARY_RADIO].transmit(packets[0])  # Attempt to transmit first element
             except NoSignalException:  # If there's no connectivity, append remaining packets to buffer
                 print("No Iridium connectivity, appending to buffer...")
                 if add_to_queue:  # Only append if we're allowed to do so
-                    self.sfr.vars.transmit_buffer += packets
+                    self.sfr.vars.transmit_buffer.extend(packets)
+                self.sfr.metrics.add_fragments(fragments, len(packets) if add_to_queue else 0)
                 return False
             except Exception:  # If we encounter another problem
                 # we want to add the packet to the transmission buffer before raising to handle in mission_control
                 if add_to_queue:
-                    self.sfr.vars.transmit_buffer += packets
+                    self.sfr.vars.transmit_buffer.extend(packets)
+                self.sfr.metrics.add_fragments(fragments, len(packets) if add_to_queue else 0)
                 raise
             packets.pop(0)  # Remove first element in queue if no problems were encountered
+        self.sfr.metrics.add_fragments(fragments, 0)
         return True
 
     @wrap_errors(LogicalError)
@@ -169,25 +335,43 @@ class CommandExecutor:
         """
         print("Attempting to transmit queue")
         while len(self.sfr.vars.transmit_buffer) > 0:  # attempt to transmit buffer
-            if not self.transmit_from_buffer(p := self.sfr.vars.transmit_buffer[0]):  # Attempt to transmit
+            # Pack as many packets as possible from the front of the queue into one transmission
+            batch = self.sfr.vars.transmit_buffer.peek(self.batch_length(self.sfr.vars.transmit_buffer))
+            if not self.transmit_from_buffer(batch):  # Attempt to transmit
                 print("Signal strength lost!")
                 # note: function will still return true if we lose signal midway, messages will be transmitted next
                 # execute cycle
                 break  # If transmission has failed, exit loop
-            self.sfr.vars.transmit_buffer.pop(0)  # Remove this packet from queue
-            print(f"Transmitted {p}")
+            for _ in batch:  # Remove these packets from queue
+                self.sfr.vars.transmit_buffer.popleft()
+            print(f"Transmitted {[str(p) for p in batch]}")
+
+    @wrap_errors(LogicalError)
+    def batch_length(self, packets: list) -> int:
+        """
+        Number of packets from the front of a list which can share a single transmission on the primary radio
+        Only Iridium supports batching, APRS always transmits one packet at a time
+        :param packets: (iterable) packets in transmission order
+        :return: (int) number of packets to transmit together
+        """
+        if self.sfr.vars.PRIMARY_RADIO != "Iridium" or self.sfr.devices["Iridium"] is None:
+            return 1
+        return self.sfr.devices["Iridium"].batch_length(packets)
 
     @wrap_errors(LogicalError)
-    def transmit_from_buffer(self, packet: TransmissionPacket):
+    def transmit_from_buffer(self, packets: list):
         """
-        Transmit a message that has been read from buffer, do not append back to buffer
-        Do not append data to packet
-        Do not split packet
-        :param packet: (TransmissionPacket) packet
+        Transmit messages that have been read from buffer, do not append back to buffer
+        Do not append data to packets
+        Do not split packets
+        :param packets: (list) of TransmissionPackets, more than one only if they fit in one batch (see batch_length)
         :return: (bool) transmission successful
         """
         try:
-            self.sfr.devices[self.sfr.vars.PRIMARY_RADIO].transmit(packet)
+            if len(packets) > 1:
+                self.sfr.devices[self.sfr.vars.PRIMARY_RADIO].transmit_batch(packets)
+            else:
+                self.sfr.devices[self.sfr.vars.PRIMARY_RADIO].transmit(packets[0])
             return True
         except NoSignalException as e:
             print("No Iridium connectivity, aborting transmit")
@@ -332,7 +516,7 @@ class CommandExecutor:
                                          if self.sfr.devices["Iridium"] is not None else 0],
                       # Append to queue either if force_queue is true or if no other GPL ping has been added to queue
                       add_to_queue=
-                      force_queue or not any([i.descriptor == "GPL" for i in self.sfr.vars.transmit_buffer]))
+                      force_queue or not self.sfr.vars.transmit_buffer.has_descriptor("GPL"))
         return result
 
     @wrap_errors(CommandExecutionException)
@@ -493,13 +677,10 @@ class CommandExecutor:
     def ASV(self, packet: TransmissionPacket) -> list:
         """
         Transmits last n signal strength datapoints
+        Optional second argument selects the format, see dump_log
         """
-        self.transmit(packet, result := self.sfr.logs["iridium"].read()  # Read log
-                      .tail(int(packet.args[0]))  # Get last n rows
-                      .to_numpy()  # Convert to numpy array
-                      .flatten()  # Compress to 1d
-                      .tolist())  # Convert to list
-        return result
+        # Latitude and longitude to ~10m, altitude to 100m
+        return self.dump_log(packet, self.sfr.logs["iridium"].read().tail(int(packet.args[0])), [4, 4, 1, 0])
 
     @wrap_errors(CommandExecutionException)
     def ASG(self, packet: TransmissionPacket) -> list:
@@ -516,35 +697,87 @@ class CommandExecutor:
     def ATB(self, packet: TransmissionPacket) -> list:
         """
         Transmits last n IMU tumble datapoints
+        Optional second argument selects the format, see dump_log
         """
-        self.transmit(packet, result := self.sfr.logs["imu"].read()  # Read logs
-                      .tail(int(packet.args[0]))  # Last n rows
-                      .to_numpy()  # Convert to numpy array
-                      .flatten()  # Convert to 1d array
-                      .tolist())  # Convert to python list for transmission
-        return result
+        # Gyro readings are logged to 3 decimal places
+        return self.dump_log(packet, self.sfr.logs["imu"].read().tail(int(packet.args[0])), [3, 3, 3])
+
+    @wrap_errors(LogicalError)
+    def dump_log(self, packet: TransmissionPacket, df, decimals: list) -> list:
+        """
+        Transmits rows of a log with ts0 and ts1 columns in the format selected by packet.args[1]
+        LEGACY_FORMAT (default): flattened list of every value
+        COMPACT_FORMAT, COMPRESSED_FORMAT: one string packet holding bytes from lib.timeseries_codec
+        :param packet: packet of received command
+        :param df: (pd.DataFrame) rows to transmit
+        :param decimals: (list) decimal places to keep for each column other than ts0 and ts1
+        :return: (list) transmitted values for legacy format, otherwise [encoded size in bytes]
+        """
+        fmt = int(packet.args[1]) if len(packet.args) > 1 else self.LEGACY_FORMAT
+        if fmt == self.LEGACY_FORMAT:
+            self.transmit(packet, result := df.to_numpy()  # Convert to numpy array
+                          .flatten()  # Compress to 1d
+                          .tolist())  # Convert to list
+            return result
+        if fmt not in (self.COMPACT_FORMAT, self.COMPRESSED_FORMAT):
+            raise CommandExecutionException(details=f"Invalid log format {fmt}")
+        encoded = timeseries_codec.encode((df["ts0"] + df["ts1"]).tolist(),
+                                          [df[c].tolist() for c in df.columns if c not in ("ts0", "ts1")],
+                                          decimals, compress=fmt == self.COMPRESSED_FORMAT)
+        self.transmit(packet, [encoded], string=True)
+        return [len(encoded)]
 
     @wrap_errors(CommandExecutionException)
     def ARS(self, packet: TransmissionPacket) -> list:
         """
-        Transmits expected size of a given command
+        Transmits projected size of a given command's response, in bytes over Iridium and characters over APRS
+        Uses the command's size model, so the command isn't run and has no side effects
         """
-        sim_packet = FullPacket(packet.args[0], packet.args[1:], 0)
-        sim_packet.set_time()
-        sim_packet.simulate = True  # Don't transmit results
-        try:  # Attempt to run command, store result
-            self.primary_registry[sim_packet.descriptor](sim_packet)
-        except Exception as e:  # Store error as a string
-            result = [repr(e)]
-            self.transmit(packet, result, string=True)
-        else:
-            # Transmit number of bytes taken up by command result
-            if self.sfr.vars.PRIMARY_RADIO == "Iridium":  # Factor in Iridium encoding procedures
-                # Remove first 7 mandatory bytes from calculation
-                self.transmit(packet, result := [len(self.sfr.devices["Iridium"].encode(sim_packet))])
-            else:  # APRS doesn't encode
-                # Only factor in size of return data
-                self.transmit(packet, result := [len(str(sim_packet.return_data))])
+        if (model := self.size_models.get(packet.args[0])) is None:
+            raise CommandExecutionException(f"Can't project size of {packet.args[0]}")
+        count, numerical = model.estimate(packet.args[1:])
+        self.transmit(packet, result := [Iridium.encoded_size(count, numerical),
+                                         APRS.encoded_size(count, numerical)])
+        return result
+
+    @wrap_errors(LogicalError)
+    def log_dump_size(self, args: list, columns: int) -> tuple:
+        """
+        Size model of dump_log
+        :param args: arguments of log dump command
+        :param columns: number of columns other than ts0 and ts1
+        :return: (number of items, whether response is numerical)
+        """
+        n = int(args[0])
+        if (int(args[1]) if len(args) > 1 else self.LEGACY_FORMAT) == self.LEGACY_FORMAT:
+            return n * (columns + 2), True
+        # Header, then about a byte per timestamp and two per value. zlib only makes it smaller
+        return 3 + columns + n * (1 + 2 * columns), False
+
+    @wrap_errors(LogicalError)
+    def replay_size(self, args: list) -> tuple:
+        """
+        Size model of AMS, looks up the logged result through the command log index
+        :param args: arguments of AMS
+        :return: (number of items, whether response is numerical)
+        """
+        if (row := self.sfr.logs["command"].lookup(int(args[0]))) is None:
+            return 0, True
+        return len(row["result"].split(":")), True
+
+    @wrap_errors(CommandExecutionException)
+    def APF(self, packet: TransmissionPacket) -> list:
+        """
+        Transmits rolling performance metrics of a given command, see CommandMetrics.summary
+        Transmits:
+        1. Number of executions measured
+        2. Mean and max wall time
+        3. Mean hardware IO time, bytes transmitted, packets produced, packets left in queue, energy used
+        4. Wall time histogram
+        """
+        if packet.args[0] not in self.primary_registry:
+            raise CommandExecutionException(f"Invalid command {packet.args[0]}")
+        self.transmit(packet, result := self.sfr.metrics.summary(packet.args[0]))
         return result
 
     @wrap_errors(CommandExecutionException)
@@ -552,11 +785,10 @@ class CommandExecutor:
         """
         Repeat result of command with given MSN
         """
-        df = self.sfr.logs["command"].read()  # Read logs
-        search = (df[df["msn"] == packet.args[0]]  # Rows of dataframe where msn is target
-                  ["result"]  # Result column
-                  [0]  # First item (first time we had a command with this msn, if multiple)
-                  .split(":"))  # Split over : to return the result (logged as a : separated string) as a list
+        # First time we had a command with this msn, if multiple
+        if (row := self.sfr.logs["command"].lookup(int(packet.args[0]))) is None:
+            raise CommandExecutionException(details=f"No command with msn {int(packet.args[0])}")
+        search = row["result"].split(":")  # Result is logged as a : separated string
         self.transmit(packet, result := [float(i) for i in search])  # Cast strings to floats for transmission
         return result
 
@@ -653,8 +885,8 @@ class CommandExecutor:
             self.sfr.analytics.total_energy_generated(),
             self.sfr.analytics.total_data_transmitted(),
             self.sfr.analytics.orbital_decay(),
-            (df := self.sfr.logs["command"].read())[df["radio"] == "Iridium"].shape[0],
-            (df := self.sfr.logs["command"].read())[df["radio"] == "APRS"].shape[0],
+            self.sfr.logs["command"].count("Iridium"),
+            self.sfr.logs["command"].count("APRS"),
             self.sfr.logs["iridium"].read().shape[0],
             self.sfr.logs["power"].read().shape[0],
             self.sfr.logs["solar"].read().shape[0]
@@ -681,9 +913,7 @@ class CommandExecutor:
         startdif = time.time() - self.sfr.vars.START_TIME
         laststartdif = time.time() - self.sfr.vars.LAST_STARTUP
 
-        jokes_object = JokesGame(self.sfr, -1)
-        jokes_object.set_game("Random")
-        joke = jokes_object.get_joke()
+        joke = JokeCorpus.random_joke()
 
         self.transmit(packet, result := [
             str(int(startdif / 100000) * 100000),
@@ -694,8 +924,8 @@ class CommandExecutor:
             str(self.sfr.analytics.total_energy_generated()),
             str(self.sfr.analytics.total_data_transmitted()),
             str(self.sfr.analytics.orbital_decay()),
-            str((df := self.sfr.logs["command"].read())[df["radio"] == "Iridium"].shape[0]),
-            str((df := self.sfr.logs["command"].read())[df["radio"] == "APRS"].shape[0]),
+            str(self.sfr.logs["command"].count("Iridium")),
+            str(self.sfr.logs["command"].count("APRS")),
             str(self.sfr.logs["iridium"].read().shape[0]),
             str(self.sfr.logs["power"].read().shape[0]),
             str(self.sfr.logs["solar"].read().shape[0]),
@@ -709,7 +939,7 @@ class CommandExecutor:
         """
         Power cycle satellite
         """
-        self.transmit(packet, result := [])
+        self.transmit(packet, result := [], urgent=True)  # Won't reach the end of execute_buffers
         self.sfr.all_off(override_default_exceptions=True)
         time.sleep(.5)
         if not packet.simulate:
@@ -721,14 +951,14 @@ class CommandExecutor:
         """
         Reboot pi
         """
-        self.transmit(packet, [])
+        self.transmit(packet, [], urgent=True)  # Won't reach the end of execute_buffers
         os.system("sudo reboot")
 
     def ICT(self, packet: TransmissionPacket):
         """
         Clears transmission queue, only to be used in an emergency
         """
-        self.sfr.vars.transmit_buffer = []
+        self.sfr.vars.transmit_buffer.clear()
         self.transmit(packet, result := [])
         return result
 
@@ -776,7 +1006,7 @@ class CommandExecutor:
     def ZMV(self, packet: TransmissionPacket):
         if str(self.sfr.MODE) != "Outreach":
             raise CommandExecutionException("Cannot use outreach mode function if not in outreach mode")
-        self.sfr.MODE.game_queue.append(packet.args[0])
+        self.sfr.MODE.string_game_queue.append(packet.args[0])
         self.transmit(packet, result := [])
         return result
 
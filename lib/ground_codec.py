@@ -0,0 +1,211 @@
+"""
+Reference decoder for messages downlinked over Iridium, and encoder for commands uplinked over Iridium and APRS
+Ground software should encode and decode messages exactly like this
+Only depends on the standard library, lib.exceptions, lib.timeseries_codec and lib.opcodes so it can be copied to the
+ground station as-is
+"""
+import base64
+import math
+from lib.exceptions import wrap_errors, LogicalError
+from lib import timeseries_codec, opcodes
+
+# Must match Iridium.BATCH_CODE
+BATCH_CODE = 0x04
+# Must match Iridium.UPLINK_BATCH_CODE
+UPLINK_BATCH_CODE = 0xff
+
+
+@wrap_errors(LogicalError)
+def decode_float(data: list) -> float:
+    """
+    Decodes one 3 byte number encoded by Iridium.encode
+    Bits 23-19 are a twos complement base 10 exponent, bits 18-0 a twos complement coefficient with 4 decimal places
+    :param data: three bytes, MSB first
+    :type data: list
+    :return: decoded number
+    :rtype: float
+    """
+    num = (data[0] << 16) | (data[1] << 8) | data[2]
+    exp = num >> 19
+    if exp & (1 << 4):  # Negative exponent
+        exp -= 1 << 5
+    coef = num & 0x7ffff
+    if coef & (1 << 18):  # Negative coefficient
+        coef -= 1 << 19
+    return coef / 10000 * 10 ** exp
+
+
+@wrap_errors(LogicalError)
+def decode_packet(data: list) -> dict:
+    """
+    Decodes a single packet encoded by Iridium.encode
+    :param data: encoded bytes of one packet
+    :type data: list
+    :return: dictionary of packet fields, descriptor and msn are None if the packet doesn't have them
+        descriptor is the 3 character string, or the raw opcode if it isn't in the opcode table
+        raw holds the undecoded payload, for binary responses like compact log dumps
+    :rtype: dict
+    """
+    response, numerical = bool(data[0] & 2), bool(data[0] & 1)
+    date = (data[2] << 8) | data[3]
+    decoded = {
+        "response": response,
+        "numerical": numerical,
+        "index": data[1],
+        "day": date >> 11,
+        "hour": (date >> 6) & 0x1f,
+        "minute": date & 0x3f,
+        "descriptor": None,
+        "msn": None,
+        "raw": None,
+    }
+    start = 4
+    if response:  # Responses to commands carry descriptor and msn
+        decoded["descriptor"] = opcodes.decode_descriptor(data[4]) or data[4]
+        decoded["msn"] = (data[5] << 8) | data[6]
+        start = 7
+    elif numerical:  # Unsolicited data carries only a descriptor
+        decoded["descriptor"] = opcodes.decode_descriptor(data[4]) or data[4]
+        start = 5
+    payload = data[start:]
+    decoded["raw"] = bytes(payload)
+    if numerical:
+        decoded["data"] = [decode_float(payload[i:i + 3]) for i in range(0, len(payload) - 2, 3)]
+    else:
+        decoded["data"] = [bytes(payload).decode("ascii", errors="replace")]
+    return decoded
+
+
+@wrap_errors(LogicalError)
+def decode_message(message) -> list:
+    """
+    Decodes a downlinked message, which is either a single packet or a batch of packets built by Iridium.encode_batch
+    Batch format: [BATCH_CODE, number of packets, length of packet 1, packet 1..., length of packet 2, packet 2...]
+    :param message: received message payload
+    :type message: bytes or list
+    :return: list of decoded packets (see decode_packet), in transmission order
+    :rtype: list
+    """
+    message = list(message)
+    if message[0] != BATCH_CODE:
+        return [decode_packet(message)]
+    packets = []
+    position = 2
+    for _ in range(message[1]):
+        length = message[position]
+        packets.append(decode_packet(message[position + 1:position + 1 + length]))
+        position += 1 + length
+    if position != len(message):
+        raise LogicalError(details="Batch length mismatch")
+    return packets
+
+
+@wrap_errors(LogicalError)
+def decode_log_dump(payload) -> tuple:
+    """
+    Decodes a compact log dump (ASV, ATB with format 1 or 2)
+    Long dumps are split over several packets, pass their payloads in index order
+    :param payload: raw payload bytes from Iridium or base64 text from APRS, or a list of either
+    :type payload: bytes, str or list
+    :return: list of timestamps, list of columns (see lib.timeseries_codec.decode)
+    :rtype: tuple
+    """
+    if not isinstance(payload, list):
+        payload = [payload]
+    # APRS packets are base64 encoded individually, so decode each before joining
+    return timeseries_codec.decode(b"".join([base64.b64decode(p) if isinstance(p, str) else p for p in payload]))
+
+
+@wrap_errors(LogicalError)
+def encode_float(n: float) -> list:
+    """
+    Encodes one number into 3 bytes, the inverse of decode_float
+    :param n: number to encode, rounded to five significant digits
+    :type n: float
+    :return: three bytes, MSB first
+    :rtype: list
+    """
+    exp = int(math.floor(math.log10(abs(n)))) if n != 0 else 0
+    coef = round(n / 10 ** exp * 10000)  # Five significant digits
+    if abs(coef) >= 100000:  # Rounded up to the next power of 10, such as 9.99999
+        coef, exp = coef // 10, exp + 1
+    if not -16 <= exp <= 15:  # Exponent is 5 bits, two's complement
+        raise LogicalError(details=f"{n} is out of range for uplink")
+    return [(num := ((exp & 0x1f) << 19) | (coef & 0x7ffff)) >> 16, (num >> 8) & 0xff, num & 0xff]
+
+
+@wrap_errors(LogicalError)
+def encode_args(descriptor: str, args: list) -> list:
+    """
+    Encodes the arguments of one command, in the format given by the opcode table
+    :param descriptor: descriptor of command
+    :type descriptor: str
+    :param args: numbers, a single string for ascii commands (ICE, ZMV),
+        or a descriptor followed by numbers for descriptor commands (ARS, APF)
+    :type args: list
+    :return: encoded bytes
+    :rtype: list
+    """
+    if (arg_format := opcodes.ARG_FORMATS[descriptor]) == opcodes.ASCII:
+        return list(args[0].encode("ascii"))
+    if arg_format == opcodes.DESCRIPTOR:
+        args = [opcodes.encode_descriptor(args[0])] + list(args[1:])
+    return [b for n in args for b in encode_float(n)]
+
+
+@wrap_errors(LogicalError)
+def frame_uplink(msg: list) -> bytes:
+    """
+    Adds length and checksum to an uplinked message, as checked by Iridium.decode
+    """
+    checksum = sum(msg) & 0xffff
+    return bytes([len(msg) >> 8, len(msg) & 0xff] + msg + [checksum >> 8, checksum & 0xff])
+
+
+@wrap_errors(LogicalError)
+def encode_uplink(descriptor: str, args: list) -> bytes:
+    """
+    Encodes a single command for uplink over Iridium, its msn is the MTMSN assigned by the gateway
+    :param descriptor: descriptor of command
+    :type descriptor: str
+    :param args: arguments of command, see encode_args
+    :type args: list
+    :return: message to send
+    :rtype: bytes
+    """
+    return frame_uplink([opcodes.encode_descriptor(descriptor)] + encode_args(descriptor, args))
+
+
+@wrap_errors(LogicalError)
+def encode_uplink_batch(commands: list) -> bytes:
+    """
+    Encodes several commands into one message for uplink over Iridium, executed in order
+    Format: [UPLINK_BATCH_CODE, number of commands,
+        opcode 1, msn 1 (2 bytes, MSB first), length of args 1, args 1..., opcode 2, ...]
+    :param commands: (descriptor, msn, args) of each command
+    :type commands: list
+    :return: message to send
+    :rtype: bytes
+    """
+    msg = [UPLINK_BATCH_CODE, len(commands)]
+    for descriptor, msn, args in commands:
+        encoded = encode_args(descriptor, args)
+        if len(encoded) > 0xff:
+            raise LogicalError(details="Arguments too long to batch")
+        msg += [opcodes.encode_descriptor(descriptor), msn >> 8, msn & 0xff, len(encoded)] + encoded
+    return frame_uplink(msg)
+
+
+@wrap_errors(LogicalError)
+def encode_aprs_uplink(commands: list, prefix: str = "TJ;") -> str:
+    """
+    Encodes one or more commands into one line for uplink over APRS, executed in order
+    :param commands: (descriptor, msn, args) of each command
+    :type commands: list
+    :param prefix: "TJ;" for primary registry commands, "OUT;" for outreach commands
+    :type prefix: str
+    :return: line to send
+    :rtype: str
+    """
+    return prefix + "&".join([f"{descriptor}:{msn}:" + "".join([f"{a}:" for a in args])
+                              for descriptor, msn, args in commands])
@@ -1,5 +1,6 @@
 import time
 import os
+import csv
 import pandas as pd
 import json
 import pickle
@@ -38,7 +39,7 @@ class Log:
                 print(f"Error in handling log of type {type(self.sub).__name__}: {e}")
                 print("Assuming corruption, attempting to proceed by clearing log")
                 self.sub.clear()
-                return func(*args, **kwargs)  # Attempt to run function again, raises error if still fails
+                return func(self, *args, **kwargs)  # Attempt to run function again, raises error if still fails
         return wrapped
 
     @wrap_errors(LogicalError)
@@ -126,6 +127,8 @@ class PKLLog(Log):
 
 
 class CSVLog(Log):
+    MAX_LENGTH = 100000  # Oldest rows are dropped once a log grows past this
+
     @wrap_errors(LogicalError)
     def __init__(self, path: str, headers: list):
         """
@@ -133,9 +136,21 @@ class CSVLog(Log):
         """
         self.headers = headers
         super().__init__(path, self)
-        if pd.read_csv(self.path).columns.tolist() != self.headers:
-            self.clear()  # Clear log if columns don't match up (out of date log)
-        
+        if (columns := pd.read_csv(self.path, nrows=0).columns.tolist()) != self.headers:
+            self.migrate(columns)  # Out of date log
+
+    @wrap_errors(LogicalError)
+    def migrate(self, columns: list) -> None:
+        """
+        Rewrite a log written with different headers, keeping its rows
+        Columns in both keep their values, new columns are left empty in old rows, removed columns are dropped
+        Cleared instead if no column is kept, since none of the old rows would mean anything
+        :param columns: headers the log was written with
+        """
+        if len(set(columns) & set(self.headers)) == 0:
+            return self.clear()
+        self.read().reindex(columns=self.headers).to_csv(self.path, mode="w", header=True, index=False)
+
     @wrap_errors(LogicalError)
     def clear(self):
         with open(self.path, "w") as f:  # Open file
@@ -150,9 +165,9 @@ class CSVLog(Log):
         if list(data.keys()) != self.headers:  # Raise error if keys are wrong
             raise LogicalError(details="Incorrect keys for logging")
         new_row = pd.DataFrame.from_dict({k: [v] for (k, v) in data.items()})  # DataFrame from dict
-        if len(df := self.read()) > 100000:  # If this log is extremely long
+        if self.length() > self.MAX_LENGTH:  # If this log is extremely long
             # Remove first row and append to log
-            df.iloc[1:].append(new_row).to_csv(self.path, mode="w", header=True, index=False)
+            pd.concat([self.read().iloc[1:], new_row]).to_csv(self.path, mode="w", header=True, index=False)
         else:
             new_row.to_csv(self.path, mode="a", header=False, index=False)  # Append to log
 
@@ -164,6 +179,14 @@ class CSVLog(Log):
         """
         return pd.read_csv(self.path, header=0)
 
+    @Log.access_wrap
+    def length(self) -> int:
+        """
+        Number of rows in log, subclasses which track this should override
+        :return: number of rows
+        """
+        return len(self.read())
+
     @Log.access_wrap
     def truncate(self, n):
         """
@@ -175,10 +198,182 @@ class CSVLog(Log):
             df.iloc[:-n].to_csv(self.path, mode="w", header=True, index=False)
 
 
+class CommandLog(CSVLog):
+    """
+    Command log with a persistent index, so looking up a command by msn and counting commands per radio
+    don't need to read the whole log
+    The index file holds one "msn,offset,radio" line per row of the log, appended on every write
+    It's loaded on startup, and rebuilt from the log if it's missing or doesn't match the log
+    """
+    @wrap_errors(LogicalError)
+    def __init__(self, path: str, headers: list):
+        """
+        Create a new command log, headers must include msn and radio
+        """
+        self.index_path = path + ".idx"
+        self.offsets = {}  # Byte offset of first row with each msn
+        self.counts = {}  # Number of rows for each radio
+        self.rows = 0
+        super().__init__(path, headers)
+        self.load_index()
+
+    @wrap_errors(LogicalError)
+    def clear(self):
+        super().clear()
+        self.reset_index()
+
+    @Log.access_wrap
+    def write(self, data: dict) -> None:
+        """
+        Append one line to the log and index it
+        :param data: dictionary of the form {"column_name": value}
+        """
+        offset = os.path.getsize(self.path)  # New row starts at current end of file
+        rewrite = self.length() > self.MAX_LENGTH  # Superclass rewrites whole log, moving every row
+        super().write(data)
+        if rewrite:
+            self.rebuild_index()
+        else:
+            self.index_row(data["msn"], offset, data["radio"])
+
+    @Log.access_wrap
+    def truncate(self, n):
+        super().truncate(n)
+        self.rebuild_index()
+
+    @wrap_errors(LogicalError)
+    def length(self) -> int:
+        return self.rows
+
+    @wrap_errors(LogicalError)
+    def reset_index(self) -> None:
+        """
+        Empty the index
+        """
+        self.offsets, self.counts, self.rows = {}, {}, 0
+        open(self.index_path, "w").close()
+
+    @wrap_errors(LogicalError)
+    def index_row(self, msn, offset: int, radio: str, persist: bool = True) -> None:
+        """
+        Add one row of the log to the index
+        :param msn: msn of row
+        :param offset: byte offset of row in log
+        :param radio: radio of row
+        :param persist: whether to append to index file
+        """
+        msn = int(float(msn))
+        self.offsets.setdefault(msn, offset)  # Keep first occurrence, like the original AMS behavior
+        self.counts[radio] = self.counts.get(radio, 0) + 1
+        self.rows += 1
+        if persist:
+            with open(self.index_path, "a") as f:
+                f.write(f"{msn},{offset},{radio}\n")
+
+    @wrap_errors(LogicalError)
+    def load_index(self) -> None:
+        """
+        Load index file, rebuilding it if missing or inconsistent with the log
+        Consistency check is that the last indexed row ends exactly at the end of the log
+        """
+        if not os.path.exists(self.index_path):
+            return self.rebuild_index()
+        self.offsets, self.counts, self.rows = {}, {}, 0
+        last = None
+        with open(self.index_path, "r") as f:
+            for line in f:
+                msn, offset, radio = line.rstrip("\n").split(",", 2)
+                self.index_row(msn, last := int(offset), radio, persist=False)
+        with open(self.path, "rb") as f:
+            if last is None:
+                consistent = len(f.readline()) == os.path.getsize(self.path)  # Only headers
+            else:
+                f.seek(last)
+                consistent = last + len(self.read_record(f)) == os.path.getsize(self.path)
+        if not consistent:
+            self.rebuild_index()
+
+    @staticmethod
+    @wrap_errors(LogicalError)
+    def read_record(f) -> bytes:
+        """
+        Read one row of a csv file, which spans several lines if a quoted value (such as a result) has line breaks
+        Quotes inside values are doubled, so the row ends at the first line break after an even number of quotes
+        :param f: file opened in binary mode, positioned at the start of a row
+        :return: bytes of the row including its final line break, empty at end of file
+        """
+        record = f.readline()
+        while record.count(b'"') % 2 == 1 and len(line := f.readline()) > 0:
+            record += line
+        return record
+
+    @wrap_errors(LogicalError)
+    def rebuild_index(self) -> None:
+        """
+        Rebuild index by scanning the log row by row
+        """
+        self.reset_index()
+        msn_col, radio_col = self.headers.index("msn"), self.headers.index("radio")
+        lines = []
+        with open(self.path, "rb") as f:
+            f.readline()  # Skip headers
+            while len(record := self.read_record(f)) > 0:
+                row = next(csv.reader([record.decode("utf-8")]))
+                lines.append(f"{int(float(row[msn_col]))},{f.tell() - len(record)},{row[radio_col]}\n")
+                self.index_row(row[msn_col], f.tell() - len(record), row[radio_col], persist=False)
+        with open(self.index_path, "w") as f:
+            f.writelines(lines)
+
+    @wrap_errors(LogicalError)
+    def read_row(self, offset: int) -> dict:
+        """
+        Read a single row of the log
+        :param offset: byte offset of row
+        :return: dictionary of the form {"column_name": value}, values are strings
+        """
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            return dict(zip(self.headers, next(csv.reader([self.read_record(f).decode("utf-8")]))))
+
+    @wrap_errors(LogicalError)
+    def lookup(self, msn: int):
+        """
+        Find the first logged command with a given msn
+        :param msn: msn to look for
+        :return: (dict) row of the form {"column_name": value} with string values, None if msn was never logged
+        """
+        for attempt in range(2):
+            if (offset := self.offsets.get(int(msn))) is None:
+                return None
+            try:
+                row = self.read_row(offset)
+                if int(float(row["msn"])) == int(msn):
+                    return row
+            except (ValueError, StopIteration):
+                pass
+            self.rebuild_index()  # Index is stale, log was changed behind our back
+        raise LogicalError(details="Command log index inconsistent after rebuild")
+
+    @wrap_errors(LogicalError)
+    def count(self, radio: str) -> int:
+        """
+        Number of logged commands received over a radio
+        :param radio: radio name
+        :return: number of commands
+        """
+        return self.counts.get(radio, 0)
+
+
 class NonWritableCSV(CSVLog):
     """
     A special log type which is read-only
     """
+    @wrap_errors(LogicalError)
+    def migrate(self, columns: list) -> None:
+        """
+        Do nothing because log shouldn't ever be touched
+        """
+
     @wrap_errors(LogicalError)
     def clear(self):
         """
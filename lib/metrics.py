@@ -0,0 +1,138 @@
+import time
+import threading
+from collections import deque
+from lib.exceptions import wrap_errors, LogicalError
+
+
+def timed_io(func: callable) -> callable:
+    """
+    Decorator for driver methods which talk to hardware (I2C or serial)
+    Adds time spent in the method to the command currently being measured by sfr.metrics
+    Nested calls (request calling write and read) are only counted once, by the outermost call
+    :param func: driver method to wrap, its object must have an sfr attribute
+    :return: decorated method
+    """
+    def wrapped(self, *args, **kwargs):
+        metrics = self.sfr.metrics
+        if metrics.io_depth > 0:  # Already being timed by an enclosing call
+            return func(self, *args, **kwargs)
+        metrics.io_depth += 1
+        start = time.perf_counter()
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            metrics.io_depth -= 1
+            metrics.add_io(time.perf_counter() - start)
+    return wrapped
+
+
+class CommandMetrics:
+    """
+    Collects resource usage of each executed command, stored in sfr.metrics
+    CommandExecutor.execute brackets each command with start and stop, and drivers report into the current measurement
+    Keeps the latest WINDOW measurements of each command for rolling statistics
+    """
+    WINDOW = 50  # Number of executions kept per command
+    BUCKETS = [0.01, 0.1, 1, 10, 60]  # Upper bounds of wall time histogram buckets in seconds, plus one overflow bucket
+    FIELDS = ["wall", "io", "bytes", "fragments", "queued", "energy"]
+
+    @wrap_errors(LogicalError)
+    def __init__(self):
+        self.current = None  # Measurement of command being executed, None between commands
+        self.local = threading.local()  # Per thread state, drivers may be powered on concurrently
+        self.history = {}  # Descriptor -> deque of latest measurements
+
+    @property
+    def io_depth(self) -> int:
+        """
+        Nesting depth of timed_io calls on the current thread
+        """
+        return getattr(self.local, "io_depth", 0)
+
+    @io_depth.setter
+    def io_depth(self, value: int) -> None:
+        self.local.io_depth = value
+
+    @wrap_errors(LogicalError)
+    def start(self) -> None:
+        """
+        Begin measuring a command
+        """
+        self.current = {field: 0 for field in self.FIELDS}
+        self.current["wall"] = time.perf_counter()
+
+    @wrap_errors(LogicalError)
+    def stop(self, descriptor: str = None) -> dict:
+        """
+        Finish measuring a command and store the measurement
+        The stored measurement is the returned dictionary, so costs added to it later (see share) are kept
+        :param descriptor: descriptor of command, None to not store the measurement
+        :return: measurement, dictionary of FIELDS
+        """
+        if self.current is None:
+            raise LogicalError(details="No command being measured")
+        measurement, self.current = self.current, None
+        measurement["wall"] = time.perf_counter() - measurement["wall"]
+        if descriptor is not None:
+            self.history.setdefault(descriptor, deque(maxlen=self.WINDOW)).append(measurement)
+        return measurement
+
+    @wrap_errors(LogicalError)
+    def share(self, cost: dict, measurements: list, weights: list) -> None:
+        """
+        Split the cost of work done for several commands at once (a batched transmission) between their measurements
+        :param cost: measurement of the shared work, from stop without a descriptor
+        :param measurements: measurements of the commands, from stop
+        :param weights: share of each command, such as bytes of its packets in the batch
+        """
+        if (total := sum(weights)) == 0:
+            return
+        for measurement, weight in zip(measurements, weights):
+            for field in ["wall", "io", "bytes", "energy"]:
+                measurement[field] += cost[field] * weight / total
+
+    @wrap_errors(LogicalError)
+    def add_io(self, seconds: float) -> None:
+        """
+        Record time spent talking to hardware
+        """
+        if self.current is not None:
+            self.current["io"] += seconds
+
+    @wrap_errors(LogicalError)
+    def add_transmission(self, size: int, energy: float) -> None:
+        """
+        Record a transmission made by a radio
+        :param size: bytes transmitted
+        :param energy: estimated energy used, in J
+        """
+        if self.current is not None:
+            self.current["bytes"] += size
+            self.current["energy"] += energy
+
+    @wrap_errors(LogicalError)
+    def add_fragments(self, fragments: int, queued: int) -> None:
+        """
+        Record packets produced by splitting a response
+        :param fragments: number of packets the response was split into
+        :param queued: number of those packets left in the transmit queue
+        """
+        if self.current is not None:
+            self.current["fragments"] += fragments
+            self.current["queued"] += queued
+
+    @wrap_errors(LogicalError)
+    def summary(self, descriptor: str) -> list:
+        """
+        Rolling statistics of a command, for downlink
+        :param descriptor: descriptor of command
+        :return: number of measurements, mean and max wall time, mean of every other field, then wall time histogram
+        """
+        measurements = self.history.get(descriptor, [])
+        if len(measurements) == 0:
+            return [0] * (3 + len(self.FIELDS) - 1 + len(self.BUCKETS) + 1)
+        means = [sum([m[field] for m in measurements]) / len(measurements) for field in self.FIELDS]
+        histogram = [0] * (len(self.BUCKETS) + 1)
+        for m in measurements:
+            histogram[len([b for b in self.BUCKETS if m["wall"] > b])] += 1
+        return [len(measurements), means[0], max([m["wall"] for m in measurements]), *means[1:], *histogram]
@@ -0,0 +1,63 @@
+"""
+Opcode table for commands sent over the radios
+Each descriptor's opcode is its index in DESCRIPTORS, so commands must only ever be appended to keep old opcodes valid
+Shared by Iridium, APRS, CommandExecutor and ground software
+Only depends on lib.exceptions so it can be copied to the ground station as-is
+"""
+from lib.exceptions import wrap_errors, LogicalError
+
+# Argument formats
+NUMERICAL = 0  # Numbers
+ASCII = 1  # A single ascii string
+DESCRIPTOR = 2  # A command descriptor, sent as its opcode, followed by numbers
+
+# Opcode 0 is GRB, for unsolicited data, the rest follow CommandExecutor.primary_registry
+DESCRIPTORS = (
+    "GRB",
+    "MCH", "MSC", "MOU", "MLK", "MDF",
+    "DLN", "DLF", "DDF",
+    "GCM", "GCR", "GVT", "GPL", "GCD", "GPW", "GPR", "GOP", "GCS", "GID", "GSM", "GSV", "GSG", "GTB", "GMT", "GTS",
+    "AAP", "APW", "ASV", "ASG", "ATB", "ARS", "AMS",
+    "SUV", "SLV", "SDT", "SSF", "SFA", "SFR",
+    "USM",
+    "ITM", "IHB", "IPC", "IRB", "ICT", "ICE", "IAK",
+    "ZMV",
+    "APF",
+)
+CODES = {descriptor: code for code, descriptor in enumerate(DESCRIPTORS)}  # Descriptor -> opcode
+
+ARG_FORMATS = {descriptor: NUMERICAL for descriptor in DESCRIPTORS}  # Descriptor -> argument format
+ARG_FORMATS.update({
+    "ICE": ASCII,
+    "ZMV": ASCII,
+    "ARS": DESCRIPTOR,
+    "APF": DESCRIPTOR,
+})
+
+
+@wrap_errors(LogicalError)
+def encode_descriptor(descriptor: str) -> int:
+    """
+    Opcode of a descriptor
+    :param descriptor: 3 character command descriptor
+    :type descriptor: str
+    :return: opcode
+    :rtype: int
+    """
+    if (code := CODES.get(descriptor)) is None:
+        raise LogicalError(details=f"Invalid descriptor string {descriptor}")
+    return code
+
+
+@wrap_errors(LogicalError)
+def decode_descriptor(code: int) -> str:
+    """
+    Descriptor of an opcode, None if it isn't a valid opcode
+    :param code: opcode
+    :type code: int
+    :return: 3 character command descriptor
+    :rtype: str
+    """
+    if not 0 <= code < len(DESCRIPTORS):
+        return None
+    return DESCRIPTORS[code]
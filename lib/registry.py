@@ -1,4 +1,5 @@
 import time
+from concurrent.futures import ThreadPoolExecutor
 from Drivers.eps import EPS
 from Drivers.battery_emulator import Battery  # TODO: DEBUG, CHANGE
 from Drivers.bno055 import IMU_I2C
@@ -10,8 +11,11 @@ from MainControlLoop.Mode.outreach.outreach import Outreach
 from MainControlLoop.Mode.recovery import Recovery
 from lib.analytics import Analytics
 from lib.command_executor import CommandExecutor
-from lib.log import CSVLog, JSONLog, PKLLog, NonWritableCSV
+from lib.log import CSVLog, JSONLog, PKLLog, NonWritableCSV, CommandLog
 from lib.log import Logger
+from lib.transmit_queue import TransmitQueue
+from lib.signal_predictor import SignalPredictor
+from lib.metrics import CommandMetrics
 from lib.exceptions import wrap_errors, LogicalError
 from Drivers.aprs import APRS
 from Drivers.iridium import Iridium
@@ -50,9 +54,10 @@ class Vars:
         self.LOCKED_OFF_DEVICES = set()  # set of string names of devices locked in the off state
         self.CONTACT_ESTABLISHED = False
         self.ENABLE_SAFE_MODE = False
-        self.transmit_buffer = []
+        self.transmit_buffer = TransmitQueue()
         self.command_buffer = []
         self.outreach_buffer = []
+        self.outreach_games = []  # Game strings left unanswered when Outreach mode ended, resubmitted when it's next run
         self.START_TIME = time.time()
         self.LAST_COMMAND_RUN = time.time()
         self.LAST_MODE_SWITCH = time.time()
@@ -156,11 +161,13 @@ class StateFieldRegistry:
             "iridium": CSVLog("./lib/data/iridium_data.csv",
                               ["ts0", "ts1", "latitude", "longitude", "altitude", "signal"]),
             "imu": CSVLog("./lib/data/imu_data.csv", ["ts0", "ts1", "xgyro", "ygyro", "zgyro"]),
-            "command": CSVLog("./lib/data/command_log.csv",
-                              ["ts0", "ts1", "radio", "command", "arg", "registry", "msn", "result"]),
+            "command": CommandLog("./lib/data/command_log.csv",
+                              ["ts0", "ts1", "radio", "command", "arg", "registry", "msn", "result",
+                               "wall", "io", "bytes", "energy"]),
             "transmission": CSVLog("./lib/data/transmission_log.csv", ["ts0", "ts1", "radio", "size"]),
         }
 
+        self.metrics = CommandMetrics()  # Before any driver, drivers report into it
         self.eps = EPS(self)  # EPS never turns off
         self.battery = Battery(self)
         self.analytics = Analytics(self)
@@ -194,6 +201,7 @@ class StateFieldRegistry:
             "Antenna Deployer": AntennaDeployer
         }
         self.vars = self.load()
+        self.signal_predictor = SignalPredictor(self)  # Needs vars and logs
 
     @wrap_errors(LogicalError)
     def sleep(self, t: int) -> None:
@@ -399,10 +407,92 @@ class StateFieldRegistry:
         self.eps.commands["Pin On"](component)  # turns on component
         for i in self.component_to_class[component].SERIAL_CONVERTERS:
             self.eps.commands["Pin On"](i)  # Turns on all serial converters for this component
-        time.sleep(.5)  # Wait for device to boot
+        time.sleep(self.component_to_class[component].BOOT_TIME)  # Wait for device to boot
         # registers component as on by setting devices value to instantiated object
         self.devices[component] = self.component_to_class[component](self)
 
+    @wrap_errors(LogicalError)
+    def run_concurrently(self, function: callable, components: list) -> dict:
+        """
+        Calls a function for each component on its own thread, and waits for all of them to finish
+        Every call is allowed to finish even if one fails, then the first exception is raised
+        :param function: function taking a component name
+        :type function: callable
+        :param components: components to call function for
+        :type components: list
+        :return: component -> return value of function
+        :rtype: dict
+        """
+        if len(components) == 0:
+            return {}
+        with ThreadPoolExecutor(max_workers=len(components)) as pool:
+            futures = {component: pool.submit(function, component) for component in components}
+        results, errors = {}, []
+        for component, future in futures.items():
+            if (e := future.exception()) is not None:
+                errors.append(e)
+            else:
+                results[component] = future.result()
+        if len(errors) > 0:
+            raise errors[0]
+        return results
+
+    @wrap_errors(LogicalError)
+    def power_on_many(self, components: list) -> None:
+        """
+        Turns on several components in roughly the time the slowest one takes
+        Switches on all PDMs and serial converters first, waits once for the longest BOOT_TIME,
+        then constructs drivers concurrently
+        Components which are already on or locked off are skipped, like power_on
+        :param components: components to turn on
+        :type components: list
+        """
+        components = [c for c in dict.fromkeys(components)
+                      if self.devices[c] is None and c not in self.vars.LOCKED_OFF_DEVICES]
+        if len(components) == 0:
+            return
+        for component in components:
+            self.eps.commands["Pin On"](component)  # turns on component
+            for i in self.component_to_class[component].SERIAL_CONVERTERS:
+                self.eps.commands["Pin On"](i)  # Turns on all serial converters for this component
+        time.sleep(max([self.component_to_class[c].BOOT_TIME for c in components]))  # Wait for devices to boot
+
+        def construct(component: str) -> None:
+            self.devices[component] = self.component_to_class[component](self)
+        self.run_concurrently(construct, components)
+
+    @wrap_errors(LogicalError)
+    def power_off_many(self, components: list, safe: bool = False) -> None:
+        """
+        Turns off several components, terminating their drivers concurrently
+        Components which are already off or locked on are skipped, like power_off
+        :param components: components to turn off
+        :type components: list
+        :param safe: whether to ignore errors in terminating devices
+        :type safe: bool
+        """
+        components = [c for c in dict.fromkeys(components)
+                      if self.devices[c] is not None and c not in self.vars.LOCKED_ON_DEVICES]
+        errors = []
+
+        def terminate(component: str) -> bool:
+            try:
+                self.devices[component].terminate()
+            except Exception as e:
+                if not safe:
+                    errors.append(e)
+                    return False  # Leave on, like power_off
+            return True
+        terminated = self.run_concurrently(terminate, components)
+        for component in components:  # EPS commands stay on this thread
+            if terminated[component]:
+                self.devices[component] = None  # removes from dict
+                self.eps.commands["Pin Off"](component)  # turns off component
+                for i in self.component_to_class[component].SERIAL_CONVERTERS:
+                    self.eps.commands["Pin Off"](i)  # Switch off serial converters for this component
+        if len(errors) > 0:
+            raise errors[0]
+
     @wrap_errors(LogicalError)
     def power_off(self, component: str, safe: bool = False) -> None:
         """
@@ -447,10 +537,8 @@ class StateFieldRegistry:
         :type exceptions: list
         """
         exceptions = (exceptions or []) + ["Antenna Deployer", "IMU"]  # Set to default list
-
-        for key in self.devices:
-            if not self.devices[key] and key not in exceptions:  # if device is off and not in exceptions
-                self.power_on(key)  # turn on device and serial converter if applicable
+        # turn on every device which is off and not in exceptions, and their serial converters
+        self.power_on_many([key for key in self.devices if not self.devices[key] and key not in exceptions])
 
     @wrap_errors(LogicalError)
     def all_off(self, exceptions=None, override_default_exceptions=False, safe=False) -> None:
@@ -463,10 +551,8 @@ class StateFieldRegistry:
         :type safe: bool
         """
         exceptions = (exceptions or []) + (["Antenna Deployer", "IMU"] if not override_default_exceptions else [])
-
-        for key in self.devices:
-            if self.devices[key] and key not in exceptions:  # if device  is on and not in exceptions
-                self.power_off(key, safe=safe)  # turn off device and serial converter if applicable
+        # turn off every device which is on and not in exceptions, and their serial converters
+        self.power_off_many([key for key in self.devices if self.devices[key] and key not in exceptions], safe=safe)
 
     @wrap_errors(LogicalError)
     def set_primary_radio(self, new_radio: str, turn_off_old=False) -> bool:
@@ -0,0 +1,94 @@
+import time
+from Drivers.transmission_packet import TransmissionPacket
+from lib.exceptions import wrap_errors, LogicalError
+
+
+class ResponseCache:
+    """
+    Short lived cache of results of read-only query commands, shared by primary and secondary registries
+    Keyed by descriptor and args, so repeats of the same query within a command's TTL reuse the last result
+    An entry is also invalidated when any of the Vars fields it was computed from changes,
+    or when any other command runs, since those may change state
+    """
+    TTL = {  # Seconds each command's result stays valid for
+        "GCS": 10,
+        "GPW": 5,  # EPS I2C sweep
+        "GSG": 5,  # EPS I2C sweep
+        "GVT": 5,  # Battery I2C read
+        "GTB": 2,  # Tumble changes quickly
+        "GCD": 30,  # Reads power and solar logs, I2C IMU read
+        "GSV": 60,
+        "GOP": 60,
+    }
+    DEPENDENCIES = {  # Vars fields each command's result depends on
+        "GCS": (),  # Depends on everything, relies on TTL and invalidation by other commands
+        "GPW": (),
+        "GSG": (),
+        "GVT": (),
+        "GTB": (),
+        "GCD": ("ORBITAL_PERIOD", "SIGNAL_STRENGTH_MEAN", "SIGNAL_STRENGTH_VARIABILITY", "BATTERY_CAPACITY_INT"),
+        "GSV": ("SIGNAL_STRENGTH_VARIABILITY",),
+        "GOP": ("ORBITAL_PERIOD",),
+    }
+
+    @wrap_errors(LogicalError)
+    def __init__(self, sfr):
+        """
+        :param sfr: sfr object
+        :type sfr: :class: 'lib.registry.StateFieldRegistry'
+        """
+        self.sfr = sfr
+        self.entries = {}  # (descriptor, args) -> (expiry time, snapshot of dependencies, result)
+
+    @wrap_errors(LogicalError)
+    def cacheable(self, packet: TransmissionPacket) -> bool:
+        """
+        Whether results of this command can be cached
+        """
+        return packet.descriptor in self.TTL
+
+    @wrap_errors(LogicalError)
+    def snapshot(self, descriptor: str) -> tuple:
+        """
+        Current values of the Vars fields a command depends on
+        """
+        return tuple([getattr(self.sfr.vars, field) for field in self.DEPENDENCIES[descriptor]])
+
+    @wrap_errors(LogicalError)
+    def get(self, packet: TransmissionPacket):
+        """
+        Look up a cached result
+        :param packet: received command
+        :type packet: TransmissionPacket
+        :return: copy of cached result, None if not cached or no longer valid
+        :rtype: list
+        """
+        key = (packet.descriptor, tuple(packet.args))
+        if (entry := self.entries.get(key)) is None:
+            return None
+        expiry, snapshot, result = entry
+        if time.time() > expiry or snapshot != self.snapshot(packet.descriptor):
+            del self.entries[key]
+            return None
+        return list(result)
+
+    @wrap_errors(LogicalError)
+    def put(self, packet: TransmissionPacket, result: list) -> None:
+        """
+        Cache the result of a command, does nothing if the command isn't cacheable
+        :param packet: executed command
+        :type packet: TransmissionPacket
+        :param result: result of command
+        :type result: list
+        """
+        if not self.cacheable(packet):
+            return
+        self.entries[(packet.descriptor, tuple(packet.args))] = (
+            time.time() + self.TTL[packet.descriptor], self.snapshot(packet.descriptor), list(result))
+
+    @wrap_errors(LogicalError)
+    def invalidate(self) -> None:
+        """
+        Drop every cached result
+        """
+        self.entries = {}
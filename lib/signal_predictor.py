@@ -0,0 +1,127 @@
+import time
+from collections import deque
+from lib.exceptions import wrap_errors, LogicalError
+
+
+class SignalPredictor:
+    """
+    Learns when Iridium is likely to have signal so sessions aren't wasted in dead zones
+    Signal strength is averaged per orbital phase bin (time since last daylight entry, modulo orbital period)
+    Trained on the iridium log at startup, then on every signal strength reading
+
+    :param sfr: sfr object
+    :type sfr: :class: 'lib.registry.StateFieldRegistry'
+    """
+    PHASE_BINS = 30  # 3 minute bins over a 90 minute orbit
+    MIN_SAMPLES = 3  # Bins with fewer readings than this are always tried, so the model keeps learning
+    STALE_TIME = 60 * 60 * 24  # Bins not updated for this long are tried again in case conditions changed
+    WEIGHT = 0.2  # Weight of each new reading in its bin's running average
+    THRESHOLD = 1  # Minimum predicted signal strength worth starting a session for
+    RECENT_TIME = 60  # Readings newer than this describe current conditions better than the model
+    TREND_LENGTH = 5  # Number of readings used to find the recent trend
+
+    @wrap_errors(LogicalError)
+    def __init__(self, sfr):
+        self.sfr = sfr
+        self.means = [0.0] * self.PHASE_BINS  # Running average signal strength of each bin
+        self.counts = [0] * self.PHASE_BINS  # Number of readings in each bin
+        self.updated = [0.0] * self.PHASE_BINS  # Last time each bin got a reading
+        self.recent = deque(maxlen=self.TREND_LENGTH)  # (time, signal) of latest readings
+        self.learn_from_log()
+
+    @wrap_errors(LogicalError)
+    def phase_bin(self, t: float) -> int:
+        """
+        Orbital phase bin of a given time
+        :param t: unix timestamp
+        :type t: float
+        :return: index of bin
+        :rtype: int
+        """
+        period = self.sfr.vars.ORBITAL_PERIOD
+        if not period > 0:  # Also catches nan from an incomplete orbits log
+            period = 90 * 60
+        phase = ((t - self.sfr.vars.LAST_DAYLIGHT_ENTRY) % period) / period
+        return min(int(phase * self.PHASE_BINS), self.PHASE_BINS - 1)
+
+    @wrap_errors(LogicalError)
+    def learn_from_log(self) -> None:
+        """
+        Train on every reading in the iridium log
+        """
+        df = self.sfr.logs["iridium"].read()
+        for t, signal in zip((df["ts0"] + df["ts1"]).tolist(), df["signal"].tolist()):
+            self.update_bin(self.phase_bin(t), signal, t)
+
+    @wrap_errors(LogicalError)
+    def update_bin(self, index: int, signal: float, t: float) -> None:
+        """
+        Add a reading to a bin's running average
+        """
+        if self.counts[index] == 0:
+            self.means[index] = signal
+        else:
+            self.means[index] += self.WEIGHT * (signal - self.means[index])
+        self.counts[index] += 1
+        self.updated[index] = max(self.updated[index], t)
+
+    @wrap_errors(LogicalError)
+    def observe(self, signal: int) -> None:
+        """
+        Record a signal strength reading taken now
+        :param signal: signal strength, 0-5
+        :type signal: int
+        """
+        self.update_bin(self.phase_bin(t := time.time()), signal, t)
+        self.recent.append((t, signal))
+
+    @wrap_errors(LogicalError)
+    def trend(self) -> float:
+        """
+        Change in signal strength per second over the latest readings
+        :return: slope of recent readings, 0 if there aren't enough
+        :rtype: float
+        """
+        if len(self.recent) < 2 or (dt := self.recent[-1][0] - self.recent[0][0]) <= 0:
+            return 0
+        return (self.recent[-1][1] - self.recent[0][1]) / dt
+
+    @wrap_errors(LogicalError)
+    def bin_open(self, index: int, t: float) -> bool:
+        """
+        Whether the model expects signal in a bin, or doesn't know enough about it yet
+        """
+        if self.counts[index] < self.MIN_SAMPLES or t - self.updated[index] > self.STALE_TIME:
+            return True
+        return self.means[index] >= self.THRESHOLD
+
+    @wrap_errors(LogicalError)
+    def window_open(self) -> bool:
+        """
+        Whether an Iridium session started now is likely to find signal
+        Fresh readings take precedence: signal is assumed while the last reading had signal or it's trending upwards
+        :return: whether to attempt a session
+        :rtype: bool
+        """
+        t = time.time()
+        if len(self.recent) > 0 and t - self.recent[-1][0] < self.RECENT_TIME:
+            if self.recent[-1][1] >= self.THRESHOLD or self.trend() > 0:
+                return True
+        return self.bin_open(self.phase_bin(t), t)
+
+    @wrap_errors(LogicalError)
+    def next_window(self) -> float:
+        """
+        Time until the next phase bin in which signal is expected
+        :return: seconds until next window, 0 if one is open now, -1 if none is expected within an orbit
+        :rtype: float
+        """
+        if self.window_open():
+            return 0
+        t = time.time()
+        period = self.sfr.vars.ORBITAL_PERIOD if self.sfr.vars.ORBITAL_PERIOD > 0 else 90 * 60
+        step = period / self.PHASE_BINS
+        for i in range(1, self.PHASE_BINS):
+            if self.bin_open(self.phase_bin(t + i * step), t):
+                return i * step
+        return -1
@@ -0,0 +1,67 @@
+from lib.exceptions import wrap_errors, LogicalError
+
+
+class SizeModel:
+    """
+    Declares how large a command's response will be, so its size can be projected without running it
+    Sizes are in response items: numbers for numerical responses, characters for string responses
+    """
+    @wrap_errors(LogicalError)
+    def estimate(self, args: list) -> tuple:
+        """
+        IMPLEMENTED IN SUBCLASSES
+        :param args: arguments the command would be run with
+        :type args: list
+        :return: (number of items, whether response is numerical)
+        :rtype: tuple
+        """
+
+
+class FixedSize(SizeModel):
+    @wrap_errors(LogicalError)
+    def __init__(self, count: int, numerical: bool = True):
+        """
+        Response is always the same size
+        :param count: number of items in response
+        :param numerical: whether response is numerical
+        """
+        self.count = count
+        self.numerical = numerical
+
+    @wrap_errors(LogicalError)
+    def estimate(self, args: list) -> tuple:
+        return self.count, self.numerical
+
+
+class PerArgSize(SizeModel):
+    @wrap_errors(LogicalError)
+    def __init__(self, per_unit: int, arg: int = 0, base: int = 0, numerical: bool = True):
+        """
+        Response size scales with one of the command's arguments, like the number of log rows to dump
+        :param per_unit: number of items per unit of the argument
+        :param arg: index of the argument
+        :param base: number of items regardless of argument
+        :param numerical: whether response is numerical
+        """
+        self.per_unit = per_unit
+        self.arg = arg
+        self.base = base
+        self.numerical = numerical
+
+    @wrap_errors(LogicalError)
+    def estimate(self, args: list) -> tuple:
+        return self.base + self.per_unit * int(args[self.arg]), self.numerical
+
+
+class EstimatedSize(SizeModel):
+    @wrap_errors(LogicalError)
+    def __init__(self, estimator: callable):
+        """
+        Response size is computed by a function, which must be cheap and free of side effects
+        :param estimator: function taking the command's arguments and returning (number of items, numerical)
+        """
+        self.estimator = estimator
+
+    @wrap_errors(LogicalError)
+    def estimate(self, args: list) -> tuple:
+        return self.estimator(args)
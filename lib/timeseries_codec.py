@@ -0,0 +1,130 @@
+"""
+Compact encoding for downlinking log dumps
+Timestamps are stored as zigzag varint delta-of-deltas, so evenly spaced samples cost one byte each
+Every other column is quantized to a fixed number of decimal places and stored as zigzag varint deltas
+Only depends on the standard library and lib.exceptions so it can be copied to the ground station as-is
+
+Format: [flags, body...], body is zlib compressed if FLAG_ZLIB is set
+Body: n rows, m columns, m decimal places, n timestamps, then n values for each column in turn
+"""
+import math
+import zlib
+from lib.exceptions import wrap_errors, LogicalError
+
+VERSION = 1  # Stored in the upper nibble of the flags byte
+FLAG_ZLIB = 0x01
+
+
+@wrap_errors(LogicalError)
+def zigzag(n: int) -> int:
+    """
+    Maps signed integers to unsigned so small magnitudes stay small: 0, -1, 1, -2... -> 0, 1, 2, 3...
+    """
+    return n * 2 if n >= 0 else -n * 2 - 1
+
+
+@wrap_errors(LogicalError)
+def unzigzag(n: int) -> int:
+    """
+    Inverse of zigzag
+    """
+    return n // 2 if n % 2 == 0 else -(n + 1) // 2
+
+
+@wrap_errors(LogicalError)
+def write_varint(out: bytearray, n: int) -> None:
+    """
+    Appends an unsigned integer 7 bits at a time, least significant first, high bit set on all but the last byte
+    """
+    while n > 0x7f:
+        out.append((n & 0x7f) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+@wrap_errors(LogicalError)
+def read_varint(data: bytes, position: int) -> tuple:
+    """
+    Reads an unsigned integer written by write_varint
+    :return: (value, position after value)
+    """
+    n, shift = 0, 0
+    while True:
+        if position >= len(data):
+            raise LogicalError(details="Truncated varint")
+        n |= (data[position] & 0x7f) << shift
+        shift += 7
+        position += 1
+        if not data[position - 1] & 0x80:
+            return n, position
+
+
+@wrap_errors(LogicalError)
+def encode(timestamps: list, columns: list, decimals: list, compress: bool = False) -> bytes:
+    """
+    Encodes a time series
+    :param timestamps: (list) of unix timestamps, truncated to whole seconds
+    :param columns: (list) of columns, each a list with one value per timestamp. nan is encoded as 0
+    :param decimals: (list) number of decimal places to keep for each column, may be negative
+    :param compress: (bool) whether to zlib compress the body, worth it for long dumps
+    :return: (bytes) encoded series
+    """
+    if len(columns) != len(decimals):
+        raise LogicalError(details="Need one decimals entry per column")
+    body = bytearray()
+    write_varint(body, len(timestamps))
+    write_varint(body, len(columns))
+    for d in decimals:
+        write_varint(body, zigzag(d))
+    previous, delta = 0, 0
+    for t in timestamps:
+        t = int(t)
+        write_varint(body, zigzag((t - previous) - delta))  # Delta of delta, first value is stored as is
+        previous, delta = t, t - previous
+    for column, d in zip(columns, decimals):
+        if len(column) != len(timestamps):
+            raise LogicalError(details="Column length doesn't match timestamps")
+        previous = 0
+        for value in column:
+            value = 0 if math.isnan(value := float(value)) else round(value * 10 ** d)
+            write_varint(body, zigzag(value - previous))
+            previous = value
+    if compress:
+        return bytes([(VERSION << 4) | FLAG_ZLIB]) + zlib.compress(bytes(body), 9)
+    return bytes([VERSION << 4]) + bytes(body)
+
+
+@wrap_errors(LogicalError)
+def decode(data: bytes) -> tuple:
+    """
+    Decodes a time series encoded by encode
+    :param data: (bytes) encoded series
+    :return: (tuple) list of timestamps, list of columns
+    """
+    if data[0] >> 4 != VERSION:
+        raise LogicalError(details=f"Unsupported version {data[0] >> 4}")
+    body = zlib.decompress(data[1:]) if data[0] & FLAG_ZLIB else data[1:]
+    n, position = read_varint(body, 0)
+    m, position = read_varint(body, position)
+    decimals = []
+    for _ in range(m):
+        d, position = read_varint(body, position)
+        decimals.append(unzigzag(d))
+    timestamps = []
+    previous, delta = 0, 0
+    for _ in range(n):
+        dod, position = read_varint(body, position)
+        delta += unzigzag(dod)
+        previous += delta
+        timestamps.append(previous)
+    columns = []
+    for d in decimals:
+        column, previous = [], 0
+        for _ in range(n):
+            diff, position = read_varint(body, position)
+            previous += unzigzag(diff)
+            column.append(previous / 10 ** d)
+        columns.append(column)
+    if position != len(body):
+        raise LogicalError(details="Trailing bytes after series")
+    return timestamps, columns
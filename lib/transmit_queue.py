@@ -0,0 +1,143 @@
+import time
+from collections import deque
+from itertools import chain
+from Drivers.transmission_packet import TransmissionPacket
+from lib.exceptions import wrap_errors, LogicalError
+
+
+class TransmitQueue:
+    """
+    Queue of packets waiting to be transmitted, stored in sfr.vars.transmit_buffer
+    Packets are dequeued by priority class, then in the order they were enqueued
+    Only holds plain containers so it can be pickled with the rest of sfr.vars
+    """
+    # Priority classes, lower values are transmitted first
+    RESPONSE = 0  # Responses to commands from ground
+    ERROR = 1  # Unsolicited strings: errors and notifications
+    HEARTBEAT = 2  # Unsolicited data: proof of life, heartbeats
+    BULK = 3  # Log dumps
+    BULK_DESCRIPTORS = {"APW", "ASV", "ASG", "ATB"}
+
+    @wrap_errors(LogicalError)
+    def __init__(self):
+        # One FIFO per priority class, holding (enqueue time, packet)
+        # Each FIFO is ordered by enqueue time, so the oldest packet is always at the head of one of them
+        self.queues = [deque() for _ in range(self.BULK + 1)]
+        self.descriptors = {}  # Number of queued packets with each descriptor
+
+    @wrap_errors(LogicalError)
+    def __len__(self) -> int:
+        return sum([len(q) for q in self.queues])
+
+    @wrap_errors(LogicalError)
+    def __iter__(self):
+        """
+        Iterate over queued packets in the order they will be dequeued
+        """
+        return (packet for _, packet in chain(*self.queues))
+
+    @wrap_errors(LogicalError)
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+    @wrap_errors(LogicalError)
+    def priority(self, packet: TransmissionPacket) -> int:
+        """
+        Priority class of a packet
+        :param packet: packet to classify
+        :type packet: TransmissionPacket
+        :return: priority class
+        :rtype: int
+        """
+        if packet.descriptor in self.BULK_DESCRIPTORS:
+            return self.BULK
+        if packet.response:
+            return self.RESPONSE
+        if not packet.numerical:
+            return self.ERROR
+        return self.HEARTBEAT
+
+    @wrap_errors(LogicalError)
+    def append(self, packet: TransmissionPacket) -> None:
+        """
+        Add a packet to the back of its priority class
+        :param packet: packet to enqueue
+        :type packet: TransmissionPacket
+        """
+        self.queues[self.priority(packet)].append((time.time(), packet))
+        self.descriptors[packet.descriptor] = self.descriptors.get(packet.descriptor, 0) + 1
+
+    @wrap_errors(LogicalError)
+    def extend(self, packets: list) -> None:
+        """
+        Add packets in order, usually the result of split_packet
+        :param packets: packets to enqueue
+        :type packets: list
+        """
+        for packet in packets:
+            self.append(packet)
+
+    @wrap_errors(LogicalError)
+    def peek(self, n: int = 1) -> list:
+        """
+        Return the next n packets to be dequeued without removing them
+        :param n: number of packets
+        :type n: int
+        :return: up to n packets
+        :rtype: list
+        """
+        result = []
+        for packet in self:
+            if len(result) == n:
+                break
+            result.append(packet)
+        return result
+
+    @wrap_errors(LogicalError)
+    def popleft(self) -> TransmissionPacket:
+        """
+        Remove and return the next packet
+        :return: highest priority, oldest packet
+        :rtype: TransmissionPacket
+        """
+        for q in self.queues:
+            if len(q) > 0:
+                _, packet = q.popleft()
+                if (count := self.descriptors[packet.descriptor] - 1) == 0:
+                    del self.descriptors[packet.descriptor]
+                else:
+                    self.descriptors[packet.descriptor] = count
+                return packet
+        raise LogicalError(details="Transmit queue is empty")
+
+    @wrap_errors(LogicalError)
+    def has_descriptor(self, descriptor: str) -> bool:
+        """
+        Whether any queued packet has the given descriptor
+        :param descriptor: descriptor to look for
+        :type descriptor: str
+        :return: whether a packet with this descriptor is queued
+        :rtype: bool
+        """
+        return descriptor in self.descriptors
+
+    @wrap_errors(LogicalError)
+    def oldest_age(self) -> float:
+        """
+        Time since the oldest queued packet was enqueued
+        :return: age in seconds, 0 if queue is empty
+        :rtype: float
+        """
+        heads = [q[0][0] for q in self.queues if len(q) > 0]
+        if len(heads) == 0:
+            return 0
+        return time.time() - min(heads)
+
+    @wrap_errors(LogicalError)
+    def clear(self) -> None:
+        """
+        Remove all packets
+        """
+        for q in self.queues:
+            q.clear()
+        self.descriptors = {}
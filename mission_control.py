@@ -79,7 +79,7 @@ class MissionControl:
                         #self.error_handle(e)  # Handle error, uncomment when done testing low level things
                     # Move on with MCL if troubleshooting solved problem (no additional exception)
             # If any packet has been in the queue for too long and APRS is not locked off, switch primary radio
-            if any([i.get_packet_age() > self.sfr.vars.PACKET_AGE_LIMIT for i in self.sfr.vars.transmit_buffer]):
+            if self.sfr.vars.transmit_buffer.oldest_age() > self.sfr.vars.PACKET_AGE_LIMIT:
                 if "APRS" not in self.sfr.vars.LOCKED_OFF_DEVICES:
                     self.sfr.set_primary_radio("APRS", True)
                     self.sfr.command_executor.transmit(UnsolicitedString("PRIMARY RADIO SWITCHED"))
@@ -163,15 +163,15 @@ class MissionControl:
         if there is message, attempt to exec method
         Should only switch back to mcl from confirmation from ground
         """
-        if self.sfr.devices["Iridium"] is not None:  # If iridium is on
-            if self.sfr.devices["Iridium"].check_signal_passive() >= self.SIGNAL_THRESHOLD:
+        if self.sfr.devices["Iridium"] is not None and self.sfr.signal_predictor.window_open():  # If iridium is on
+            if self.sfr.devices["Iridium"].mail_waiting() and \
+                    self.sfr.devices["Iridium"].check_signal_passive() >= self.SIGNAL_THRESHOLD:
                 self.sfr.devices["Iridium"].next_msg()  # Read
-        if self.sfr.devices["APRS"] is not None:  # If aprs is on
-            self.sfr.devices["APRS"].next_msg()  # Read
 
         self.sfr.command_executor.execute_buffers()  # Execute all received commands
         if self.transmission_queue_clock.time_elapsed():  # Once every 10 seconds
-            if self.sfr.devices["Iridium"] is not None and self.sfr.devices["Iridium"].check_signal_passive() >= self.SIGNAL_THRESHOLD: 
+            if self.sfr.devices["Iridium"] is not None and self.sfr.signal_predictor.window_open() and \
+                    self.sfr.devices["Iridium"].check_signal_passive() >= self.SIGNAL_THRESHOLD:
                 # If iridium is on and signal is present
                 self.sfr.command_executor.transmit_queue()  # Attempt to transmit entire transmission queue
                 self.transmission_queue_clock.update_time()